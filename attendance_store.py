@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from cache import STATE_DIR, ensure_state_dir
+
+# ==========================================
+# 🗂️ LOCAL ATTENDANCE HISTORY
+# ==========================================
+# One JSON file per account + semester under .vtop/attendance/, holding each
+# course's date-wise log together with the attended/total counters it was
+# synced at. When V-TOP still reports the same counters the log cannot have
+# changed, so the detail page does not need to be downloaded again.
+
+HISTORY_DIR = os.path.join(STATE_DIR, "attendance")
+
+
+class AttendanceStore:
+    def __init__(self, reg_no: str, semester: str, root: str = HISTORY_DIR):
+        owner = hashlib.sha256(reg_no.encode()).hexdigest()[:16]
+        self.path = os.path.join(root, f"{owner}-{semester}.json")
+        self.courses: Dict[str, Dict[str, Any]] = {}
+        self.new_rows = 0
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.courses = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def key(course: Dict[str, Any]) -> Optional[str]:
+        if not (course.get('course_id') and course.get('type_code')):
+            return None
+        return f"{course['course_id']}:{course['type_code']}"
+
+    def needs_sync(self, course: Dict[str, Any]) -> bool:
+        entry = self.courses.get(self.key(course) or "")
+        if entry is None:
+            return True
+        return (entry["attended"], entry["total"]) != (course.get('attended'), course.get('total'))
+
+    def history(self, course: Dict[str, Any]) -> List[Dict[str, str]]:
+        return self.courses.get(self.key(course) or "", {}).get("history", [])
+
+    def merge(self, course: Dict[str, Any], rows: List[Dict[str, str]]) -> int:
+        """Appends rows not seen before (status corrections update in place); returns how many were new."""
+        key = self.key(course)
+        if key is None:
+            return 0
+        entry = self.courses.setdefault(key, {"history": []})
+        known = {(r['date'], r['slot']): r for r in entry["history"]}
+        added = 0
+        for row in rows:
+            old = known.get((row['date'], row['slot']))
+            if old is None:
+                entry["history"].append(row)
+                known[(row['date'], row['slot'])] = row
+                added += 1
+            elif old != row:
+                old.update(row)
+        entry.update(attended=course.get('attended'), total=course.get('total'), synced_at=time.time())
+        self.new_rows += added
+        self._dirty = True
+        return added
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        ensure_state_dir(os.path.dirname(self.path))
+        tmp = self.path + ".tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.courses, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from services import SINGLE_FLIGHT, fetchMany, parse_memo_stats, openClient, silence_logs, vtopSessionLogin
+
+# ==========================================
+# 👥 MULTI-ACCOUNT BATCH HARVEST
+# ==========================================
+# Many accounts, one event loop. Every account gets its own VtopClient
+# (cookie jar + csrf_token on the client object, nothing module-level), and
+# at most `concurrency` sessions are open at any moment.
+
+BATCH_CONCURRENCY = 8
+
+
+def read_accounts(path: str) -> List[Tuple[str, str]]:
+    """
+    One account per line: "REGNO,PASSWORD" (tabs or spaces work too).
+    Blank lines and lines starting with # are skipped.
+    """
+    accounts = []
+    with open(path, "r") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            for sep in (",", "\t", " "):
+                if sep in line:
+                    reg_no, password = line.split(sep, 1)
+                    break
+            else:
+                print(f"[!] {path}:{n}: expected 'REGNO,PASSWORD', skipping.", file=sys.stderr)
+                continue
+            accounts.append((reg_no.strip(), password.strip()))
+    return accounts
+
+
+async def harvest_account(reg_no: str, password: str, commands: List[str], semester: Optional[str] = None,
+                          base_url: Optional[str] = None, persist: bool = True) -> Dict[str, Any]:
+    """Logs one account in and fetches `commands` for it. Never raises."""
+    silence_logs()  # dozens of interleaved "...Fetching" lines help nobody
+    started = time.perf_counter()
+    record: Dict[str, Any] = {"account": reg_no, "ok": False}
+    try:
+        async with openClient(reg_no, password, base_url) as client:
+            if not await vtopSessionLogin(client, password, persist=persist):
+                record["error"] = "login failed"
+            else:
+                document = await fetchMany(client, commands, semester)
+                record.update(ok=True, semester=document.pop("semester"), data=document)
+    except Exception as e:
+        record["error"] = str(e) or type(e).__name__
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+async def run_batch(accounts: List[Tuple[str, str]], commands: List[str], semester: Optional[str] = None,
+                    fmt: str = "json", concurrency: int = BATCH_CONCURRENCY,
+                    base_url: Optional[str] = None, persist: bool = True) -> int:
+    limit = asyncio.Semaphore(max(1, concurrency))
+    started = time.perf_counter()
+
+    async def one(reg_no, password):
+        async with limit:
+            record = await harvest_account(reg_no, password, commands, semester, base_url, persist)
+        status = "ok" if record["ok"] else f"FAILED ({record.get('error')})"
+        print(f"   [{reg_no}] {status} in {record['seconds']:.2f}s", file=sys.stderr)
+        return record
+
+    records = []
+    for next_done in asyncio.as_completed([one(r, p) for r, p in accounts]):
+        record = await next_done
+        records.append(record)
+        if fmt == "ndjson":
+            sys.stdout.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+
+    summary = {
+        "accounts": len(accounts),
+        "ok": sum(r["ok"] for r in records),
+        "failed": sum(not r["ok"] for r in records),
+        "seconds": round(time.perf_counter() - started, 3),
+        "concurrency": concurrency,
+        "requests_saved": SINGLE_FLIGHT["joined"],  # identical fetches that joined one already in flight
+        "parses_saved": parse_memo_stats()["hits"],
+    }
+    if fmt == "json":
+        # Input order, not completion order, for the aggregated document
+        order = {reg_no: i for i, (reg_no, _) in enumerate(accounts)}
+        records.sort(key=lambda r: order.get(r["account"], 0))
+        json.dump({"summary": summary, "results": records}, sys.stdout, indent=2, default=str, ensure_ascii=False)
+        sys.stdout.write("\n")
+    print(f"[+] Batch done: {summary['ok']}/{summary['accounts']} accounts in {summary['seconds']:.2f}s", file=sys.stderr)
+    return 0 if not summary["failed"] else 2
@@ -0,0 +1,180 @@
+"""
+Anonymized stand-ins for the V-TOP pages parsed in services.py.
+
+Every page is generated rather than captured, so no real student data ever
+lands in the repo. The markup follows what the parse* functions read
+(table ids, column order, section headers) and wraps it in the kind of
+chrome V-TOP ships around its fragments (hidden form fields, scripts, nav
+lists), so whole-page parsing costs roughly what it does live. Parameters
+scale each page up, e.g. 8 semesters of transcript or 200-row attendance logs.
+"""
+import random
+
+SEMESTERS = [
+    ("AP2025262", "Winter Semester 2025-26"), ("AP2025261", "Fall Semester 2025-26"),
+    ("AP2024252", "Winter Semester 2024-25"), ("AP2024251", "Fall Semester 2024-25"),
+    ("AP2023242", "Winter Semester 2023-24"), ("AP2023241", "Fall Semester 2023-24"),
+    ("AP2022232", "Winter Semester 2022-23"), ("AP2022231", "Fall Semester 2022-23"),
+]
+PREFIXES = ["CSE", "MAT", "PHY", "ENG", "ECE", "HUM", "STS", "MEC"]
+TITLES = ["Data Structures", "Linear Algebra", "Engineering Physics", "Technical English",
+          "Digital Logic", "Ethics and Values", "Soft Skills", "Engineering Graphics",
+          "Operating Systems", "Computer Networks", "Probability", "Compiler Design"]
+SLOTS = ["A1+TA1", "B1+TB1", "C1+TC1", "D1+TD1", "E1+TE1", "F1+TF1", "G1+TG1", "L31+L32"]
+REG_NO = "23BCE0000"
+
+
+def _course(i):
+    return f"{PREFIXES[i % len(PREFIXES)]}{1001 + i}", TITLES[i % len(TITLES)]
+
+
+def _page(body, chrome=40):
+    """Wraps a fragment in V-TOP-like noise: hidden inputs, scripts, menus."""
+    nav = "".join(
+        f'<li class="nav-item"><a href="javascript:void(0)" data-url="menu/item{i}" '
+        f'class="nav-link"><i class="fa fa-circle"></i> Menu Item {i}</a></li>'
+        for i in range(chrome)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>VTOP</title>
+<script type="text/javascript">var csrfName="_csrf"; var csrfValue="00000000-0000-0000-0000-000000000000";
+function dummy(){{ for (var i = 0; i < 10; i++) {{ console.log(i); }} }}</script></head>
+<body><form id="vtopMenu"><input type="hidden" name="_csrf" value="00000000-0000-0000-0000-000000000000">
+<input type="hidden" name="authorizedID" value="{REG_NO}"></form>
+<ul class="nav flex-column">{nav}</ul>
+<div class="container-fluid"><div class="card"><div class="card-body">
+{body}
+</div></div></div>
+<script>$(document).ready(function() {{ $('.table').DataTable(); }});</script>
+</body></html>"""
+
+
+def profile_page():
+    return _page(f"""
+<div class="row"><p style="font-weight: bold; text-align: center; font-size: 18px">STUDENT NAME</p>
+<div class="col-md-6"><label>REGISTER NUMBER</label><label>{REG_NO}</label>
+<label>VIT EMAIL</label><label>student.name@vitapstudent.ac.in</label>
+<label>PROGRAM</label><label>B.Tech. Computer Science and Engineering</label>
+<label>SCHOOL NAME</label><label>School of Computer Science and Engineering</label></div></div>
+<div class="accordion">
+<table class="table"><tr><td>Native State</td><td>State</td></tr><tr><td>Blood Group</td><td>O+</td></tr>
+<tr><td>Mobile Number</td><td>9000000000</td></tr><tr><td>Date of Birth</td><td>01-01-2005</td></tr></table>
+<table class="table"><tr><td>Faculty ID</td><td>70000</td></tr><tr><td>Faculty Name</td><td>PROCTOR NAME</td></tr>
+<tr><td>Faculty Email</td><td>proctor.name@vitap.ac.in</td></tr><tr><td>Faculty Mobile Number</td><td>9111111111</td></tr>
+<tr><td>Cabin</td><td>AB1-101</td></tr></table>
+</div>""")
+
+
+def semesters_page(semesters=len(SEMESTERS)):
+    options = "".join(f'<option value="{sid}">{name}</option>' for sid, name in SEMESTERS[:semesters])
+    return _page(f"""
+<select class="form-control" id="semesterSubId" name="semesterSubId">
+<option value="" selected="selected">-- Choose Semester --</option>{options}</select>""")
+
+
+def marks_page(courses=8, marks_per_course=6):
+    kinds = ["CAT-1", "CAT-2", "Assignment", "Digital Assignment", "Quiz", "Lab Assessment", "Project Review", "FAT"]
+    rows = []
+    for i in range(courses):
+        code, title = _course(i)
+        rows.append(f'<tr class="tableContent"><td>{i + 1}</td><td>{code}</td><td>{title}</td>'
+                    f'<td>Embedded Theory</td><td>AP2025260{i:04d}</td><td>Faculty {i}</td><td>{SLOTS[i % len(SLOTS)]}</td></tr>')
+        inner = ['<tr class="tableContent"><td>S.No</td><td>Mark Title</td><td>Max. Mark</td><td>Weightage %</td>'
+                 '<td>Status</td><td>Scored Mark</td><td>Weightage Mark</td><td>Remark</td></tr>']
+        for j in range(marks_per_course):
+            scored = (17 + i + j) % 31
+            inner.append(f'<tr class="tableContent-level1"><td>{j + 1}</td><td>{kinds[j % len(kinds)]}</td><td>30.00</td>'
+                         f'<td>15.00</td><td>Present</td><td>{scored}.00</td><td>{scored / 2:.2f}</td><td></td></tr>')
+        rows.append(f'<tr><td colspan="7"><table class="customTable-level1">{"".join(inner)}</table></td></tr>')
+    return _page(f"""
+<table class="customTable"><tr class="tableHeader"><td>Sl.No.</td><td>Course Code</td><td>Course Title</td>
+<td>Course Type</td><td>Class Number</td><td>Faculty</td><td>Slot</td></tr>{"".join(rows)}</table>""")
+
+
+def exam_schedule_page(courses=8, sections=("CAT1", "CAT2", "FAT")):
+    rows = []
+    for s, section in enumerate(sections):
+        rows.append(f'<tr><td class="panelHead-secondary" colspan="13">{section}</td></tr>')
+        for i in range(courses):
+            code, title = _course(i)
+            rows.append(f'<tr class="tableContent"><td>{i + 1}</td><td>{code}</td><td>{title}</td><td>Embedded Theory</td>'
+                        f'<td>AP2025260{i:04d}</td><td>{SLOTS[i % len(SLOTS)]}</td><td>{10 + i:02d}-Nov-2025</td>'
+                        f'<td>FN</td><td>09:30 AM</td><td>10:00 AM - 11:30 AM</td><td>CB {100 + s * 10 + i}</td>'
+                        f'<td>-</td><td>-</td></tr>')
+    return _page(f"""
+<table class="customTable"><tr class="tableHeader"><td>S.No.</td><td>Course Code</td><td>Course Title</td>
+<td>Course Type</td><td>Class ID</td><td>Slot</td><td>Exam Date</td><td>Exam Session</td><td>Reporting Time</td>
+<td>Exam Time</td><td>Venue</td><td>Seat Location</td><td>Seat No.</td></tr>{"".join(rows)}</table>""")
+
+
+def attendance_page(courses=8, semester="AP2025262"):
+    rows = []
+    for i in range(courses):
+        code, title = _course(i)
+        total = 30 + i
+        attended = total - (i * 3) % 11
+        rows.append(f'<tr><td>{i + 1}</td><td>AP2025260{i:04d}</td><td>{code} - {title} - Embedded Theory</td>'
+                    f'<td>TH - {SLOTS[i % len(SLOTS)]} - AB1-{200 + i}</td><td>Faculty {i}</td>'
+                    f'<td>{attended}</td><td>{total}</td><td>{attended * 100 // total}%</td>'
+                    f'<td><a href="javascript:void(0)" onclick="javascript:callStudentAttendanceDetailDisplay('
+                    f"'{semester}','{REG_NO}','AM_{code}_{i:05d}','ETH')\">View</a></td></tr>")
+    return _page(f"""
+<table class="table" id="AttendanceDetailDataTable"><thead><tr><th>Sl.No.</th><th>Class Number</th>
+<th>Course Detail</th><th>Class Detail</th><th>Faculty Detail</th><th>Attended Classes</th>
+<th>Total Classes</th><th>Attendance Percentage</th><th>View</th></tr></thead>
+<tbody>{"".join(rows)}</tbody></table>""")
+
+
+def attendance_detail_page(rows=40, seed=7):
+    rng = random.Random(seed)
+    days = ["MON", "TUE", "WED", "THU", "FRI"]
+    body = []
+    for i in range(rows):
+        status = "Absent" if rng.random() < 0.15 else "Present"
+        body.append(f'<tr><td>{i + 1}</td><td>{1 + i % 28:02d}-{["Jul", "Aug", "Sep", "Oct", "Nov"][i // 28 % 5]}-2025</td>'
+                    f'<td>{SLOTS[i % len(SLOTS)]}</td><td>{days[i % 5]} 09:00-09:50</td><td>{status}</td><td>-</td></tr>')
+    return _page(f"""
+<table class="table" id="StudentAttendanceDetailDataTable"><thead><tr><th>Sl.No.</th><th>Date</th><th>Slot</th>
+<th>Day / Time</th><th>Attendance Status</th><th>Remarks</th></tr></thead>
+<tbody>{"".join(body)}</tbody></table>""")
+
+
+def grade_history_page(semesters=1, courses_per_semester=8):
+    grades = ["S", "A", "B", "C", "D", "E"]
+    rows = []
+    for n in range(semesters * courses_per_semester):
+        code = f"{PREFIXES[n % len(PREFIXES)]}{1001 + n}"
+        title = TITLES[n % len(TITLES)]
+        rows.append(f'<tr class="tableContent"><td>{n + 1}</td><td>{code}</td><td>{title}</td><td>ETH</td>'
+                    f'<td>4.0</td><td>{grades[n % len(grades)]}</td><td>{SEMESTERS[n // courses_per_semester % len(SEMESTERS)][1]}</td>'
+                    f'<td>Regular</td></tr>')
+        # V-TOP repeats each embedded course as ETL/ETH/ELA component rows
+        rows.append(f'<tr class="tableContent-level1"><td></td><td>ETL</td><td>{title} Lab</td><td>ELA</td>'
+                    f'<td>1.0</td><td>{grades[n % len(grades)]}</td><td></td><td></td></tr>')
+    registered = semesters * courses_per_semester * 4
+    return _page(f"""
+<table class="customTable"><tr class="tableHeader"><td>Sl.No.</td><td>Course Code</td><td>Course Title</td>
+<td>Course Type</td><td>Credits</td><td>Grade</td><td>Exam Month</td><td>Course Distribution</td></tr>{"".join(rows)}</table>
+<table class="customTable"><thead><tr><th>Credits Registered</th><th>Credits Earned</th><th>CGPA</th></tr></thead>
+<tbody><tr><td>{registered}.0</td><td>{registered - 4}.0</td><td>8.42</td></tr></tbody></table>""")
+
+
+# Base page per endpoint, matching a typical single semester.
+BASE = {
+    "profile": profile_page,
+    "semesters": semesters_page,
+    "marks": marks_page,
+    "exams": exam_schedule_page,
+    "attendance": attendance_page,
+    "attendance_detail": attendance_detail_page,
+    "grades": grade_history_page,
+}
+
+# Synthetic scale-ups for the pages that actually grow.
+SCALED = {
+    "marks_x3": lambda: marks_page(courses=24, marks_per_course=8),
+    "exams_x3": lambda: exam_schedule_page(courses=24),
+    "attendance_x3": lambda: attendance_page(courses=24),
+    "attendance_detail_200": lambda: attendance_detail_page(rows=200),
+    "grades_8sem": lambda: grade_history_page(semesters=8),
+}
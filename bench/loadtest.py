@@ -0,0 +1,287 @@
+"""
+Load test: many simulated students at once against a local mock V-TOP.
+
+    python -m bench.loadtest                                  # 100 sessions, 50 at a time
+    python -m bench.loadtest --sessions 500 --concurrency 200 --latency 250 --jitter 100
+    python -m bench.loadtest --error-rate 0.02 --csrf-ttl 30 --json run.json
+    python -m bench.loadtest --base-url http://127.0.0.1:8585  # an already running mock_server.py
+
+Each session does what one student's launch does, through the real
+fetchers in services.py and a VtopClient of its own: log in, read the
+semester list, load attendance, marks and the exam schedule together (the
+prefetch), then drill into every course's attendance history. The mock
+runs in a child process so that its work does not show up as client-side
+loop lag. The report gives sessions/s and requests/s, p50/p95/p99 per step,
+event-loop lag while the sessions ran, and resident memory per open session.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+import metrics
+from mock_server import MockConfig, run_mock
+from services import (
+    DETAIL_CONCURRENCY,
+    PARSE_POOLS,
+    PARSER_BACKENDS,
+    configure_cache,
+    configure_parse_pool,
+    fetchAttendance,
+    fetchAttendanceDetails,
+    fetchExamSchedule,
+    fetchMarks,
+    fetchSemesters,
+    openClient,
+    set_parser_backend,
+    shutdown_parse_pool,
+    silence_logs,
+    vtopSessionLogin,
+)
+
+PASSWORD = "load-test"
+STEPS = ("login", "semesters", "attendance", "marks", "exams", "attendance_detail", "session")
+SAMPLE_EVERY = 0.1  # seconds between memory / active-session samples
+
+
+# --- the mock, in its own process ---
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve_mock(port: int, config: MockConfig) -> None:
+    async def serve():
+        server, _ = await run_mock("127.0.0.1", port, config)
+        async with server:
+            await server.serve_forever()
+    asyncio.run(serve())
+
+
+def start_mock(config: MockConfig):
+    port = _free_port()
+    process = multiprocessing.Process(target=_serve_mock, args=(port, config), daemon=True)
+    process.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("mock V-TOP did not start")
+
+
+def _rss() -> int:
+    """Resident set size in bytes (Linux), else the peak from getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _raise_fd_limit() -> None:
+    # Every session keeps a few keep-alive connections open
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class LoadRun:
+    def __init__(self, base_url: str, detail_concurrency: int):
+        self.base_url = base_url
+        self.detail_concurrency = detail_concurrency
+        self.latencies: Dict[str, List[float]] = {step: [] for step in STEPS}
+        self.failures: Dict[str, int] = {step: 0 for step in STEPS}
+        self.active = 0
+        self.peak_active = 0
+        self.peak_rss = 0
+        self.lags: List[float] = []
+
+    async def step(self, name: str, pending):
+        """Awaits one fetcher call; an exception or an empty answer counts as a failure."""
+        started = time.perf_counter()
+        try:
+            result = await pending
+        except Exception:
+            result = None
+        self.latencies[name].append(time.perf_counter() - started)
+        if not result:
+            self.failures[name] += 1
+        return result
+
+    async def session(self, n: int) -> bool:
+        silence_logs()
+        reg_no = f"LT{n:05d}"
+        started = time.perf_counter()
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            async with openClient(reg_no, PASSWORD, self.base_url) as client:
+                if not await self.step("login", vtopSessionLogin(client, PASSWORD, persist=False)):
+                    return False
+                semesters = await self.step("semesters", fetchSemesters(client))
+                semester = semesters[0]["id"]
+                attendance, _, _ = await asyncio.gather(
+                    self.step("attendance", fetchAttendance(client, semester)),
+                    self.step("marks", fetchMarks(client, semester)),
+                    self.step("exams", fetchExamSchedule(client, semester)),
+                )
+                async for _, history, seconds in fetchAttendanceDetails(client, semester, attendance or [],
+                                                                        self.detail_concurrency):
+                    self.latencies["attendance_detail"].append(seconds)
+                    if not history:
+                        self.failures["attendance_detail"] += 1
+            self.latencies["session"].append(time.perf_counter() - started)
+            return True
+        except Exception:
+            self.failures["session"] += 1
+            return False
+        finally:
+            self.active -= 1
+
+    async def monitor(self, tick: float, done: asyncio.Event) -> None:
+        """Records how late a periodic wake-up runs, plus memory and open sessions."""
+        next_sample = 0.0
+        while not done.is_set():
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            now = time.perf_counter()
+            self.lags.append(max(0.0, now - expected))
+            if now >= next_sample:
+                self.peak_rss = max(self.peak_rss, _rss())
+                next_sample = now + SAMPLE_EVERY
+
+
+async def run(args, base_url: str) -> Dict:
+    configure_cache(None)  # every simulated student is new: measure the network path
+    load = LoadRun(base_url, args.detail_concurrency)
+    limit = asyncio.Semaphore(max(1, args.concurrency))
+    baseline_rss = _rss()
+    requests_before = sum(metrics.REQUESTS.values.values())
+
+    async def one(n):
+        # Spread session starts over --ramp seconds
+        await asyncio.sleep(args.ramp * n / max(1, args.sessions))
+        async with limit:
+            return await load.session(n)
+
+    done = asyncio.Event()
+    monitor = asyncio.create_task(load.monitor(args.tick / 1000, done))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(n) for n in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await monitor
+
+    lags = sorted(load.lags)
+    data_requests = sum(metrics.REQUESTS.values.values()) - requests_before
+    return {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "ok": sum(results),
+        "seconds": elapsed,
+        "sessions_per_s": args.sessions / elapsed,
+        "requests_per_s": data_requests / elapsed,
+        "data_requests": data_requests,
+        "steps": {
+            step: {
+                "n": len(samples),
+                "failed": load.failures[step],
+                "p50_ms": percentile(sorted(samples), 0.50) * 1000,
+                "p95_ms": percentile(sorted(samples), 0.95) * 1000,
+                "p99_ms": percentile(sorted(samples), 0.99) * 1000,
+                "max_ms": max(samples, default=0.0) * 1000,
+            }
+            for step, samples in load.latencies.items()
+        },
+        "loop_lag_ms": {
+            "p50": statistics.median(lags) * 1000 if lags else 0.0,
+            "p99": percentile(lags, 0.99) * 1000,
+            "max": lags[-1] * 1000 if lags else 0.0,
+        },
+        "memory": {
+            "baseline_mb": baseline_rss / 2**20,
+            "peak_mb": load.peak_rss / 2**20,
+            "peak_sessions": load.peak_active,
+            "per_session_kb": max(0, load.peak_rss - baseline_rss) / max(1, load.peak_active) / 1024,
+        },
+    }
+
+
+def report(r: Dict) -> None:
+    print(f"\n{r['ok']}/{r['sessions']} sessions ok in {r['seconds']:.2f}s, {r['concurrency']} at a time: "
+          f"{r['sessions_per_s']:.1f} sessions/s, {r['requests_per_s']:.1f} data requests/s\n")
+    print(f"{'step':<20}{'n':>7}{'failed':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step, s in r["steps"].items():
+        print(f"{step:<20}{s['n']:>7}{s['failed']:>8}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}"
+              f"{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+    lag, mem = r["loop_lag_ms"], r["memory"]
+    print(f"\nloop lag   p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, max {lag['max']:.1f} ms")
+    print(f"memory     {mem['baseline_mb']:.1f} MB -> peak {mem['peak_mb']:.1f} MB with {mem['peak_sessions']} "
+          f"sessions open (~{mem['per_session_kb']:.0f} KB per session)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent simulated student sessions against a mock V-TOP")
+    parser.add_argument("--sessions", type=int, default=100, help="Simulated students in total.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Sessions open at the same time.")
+    parser.add_argument("--ramp", type=float, default=0.0, metavar="SECONDS",
+                        help="Spread session starts over this long (default: all at once).")
+    parser.add_argument("--detail-concurrency", type=int, default=DETAIL_CONCURRENCY, metavar="N",
+                        help=f"Parallel attendance history requests per session (default: {DETAIL_CONCURRENCY}).")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default="html.parser")
+    parser.add_argument("--parse-pool", choices=PARSE_POOLS, default="inline",
+                        help="Where pages are parsed, as in main.py (default: inline).")
+    parser.add_argument("--tick", type=float, default=10.0, help="Loop lag probe interval in ms.")
+    parser.add_argument("--base-url", help="Use this running server instead of starting a mock.")
+    mock = parser.add_argument_group("mock V-TOP (ignored with --base-url)")
+    mock.add_argument("--latency", type=float, default=50.0, help="Mean added latency in ms.")
+    mock.add_argument("--jitter", type=float, default=25.0, help="Uniform +/- jitter in ms.")
+    mock.add_argument("--error-rate", type=float, default=0.0, help="Share of data requests answered with 503.")
+    mock.add_argument("--csrf-ttl", type=float, default=0.0, help="CSRF token lifetime in seconds (0 = never expires).")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON.")
+    args = parser.parse_args(argv)
+
+    _raise_fd_limit()
+    process = None
+    base_url = args.base_url
+    if not base_url:
+        process, base_url = start_mock(MockConfig(args.latency, args.jitter, args.error_rate, args.csrf_ttl))
+    set_parser_backend(args.parser)
+    configure_parse_pool(args.parse_pool)
+    print(f"{args.sessions} sessions, {args.concurrency} at a time, against {base_url} "
+          f"({args.parser}, {args.parse_pool} parsing)")
+    try:
+        result = asyncio.run(run(args, base_url))
+    finally:
+        shutdown_parse_pool()
+        if process is not None:
+            process.terminate()
+
+    report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result["ok"] == result["sessions"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Event-loop lag while pages are being parsed, per --parse-pool mode.
+
+    python -m bench.loop_lag                       # inline vs thread vs process
+    python -m bench.loop_lag --jobs 32 --workers 4 --parser lxml-strainer
+
+A ticker coroutine asks to wake up every --tick ms and records how late it
+actually runs; that lateness is what every socket read, timer and prompt
+on the same loop would suffer. Meanwhile --jobs parses of the big fixture
+pages (marks, transcript, attendance logs) run concurrently through
+services.run_parser(), the way a prefetch or a batch run issues them.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from bench import fixtures
+from services import (
+    PARSE_POOLS,
+    PARSER_BACKENDS,
+    configure_parse_memo,
+    configure_parse_pool,
+    parseAttendanceDetail,
+    parseGradeHistory,
+    parseMarks,
+    run_parser,
+    set_parser_backend,
+    shutdown_parse_pool,
+)
+
+WORKLOAD = [
+    (parseMarks, fixtures.SCALED["marks_x3"]),
+    (parseGradeHistory, fixtures.SCALED["grades_8sem"]),
+    (parseAttendanceDetail, fixtures.SCALED["attendance_detail_200"]),
+]
+
+
+async def measure(jobs, tick_ms):
+    pages = [(parse, page()) for parse, page in WORKLOAD]
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        interval = tick_ms / 1000
+        while not done.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    # One warm-up round so pool start-up is not billed to the first jobs
+    await asyncio.gather(*(run_parser(parse, html) for parse, html in pages))
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(run_parser(*pages[i % len(pages)]) for i in range(jobs)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+
+    lags.sort()
+    return {
+        "seconds": elapsed,
+        "lag_p50": statistics.median(lags) if lags else 0.0,
+        "lag_p99": lags[int(0.99 * (len(lags) - 1))] if lags else 0.0,
+        "lag_max": lags[-1] if lags else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event-loop lag during concurrent parsing")
+    parser.add_argument("--jobs", type=int, default=24, help="Concurrent parses per mode.")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size for thread/process modes.")
+    parser.add_argument("--tick", type=float, default=5.0, help="Ticker interval in ms.")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default="html.parser")
+    parser.add_argument("--modes", default=",".join(PARSE_POOLS), help="Comma-separated subset of modes.")
+    args = parser.parse_args(argv)
+
+    set_parser_backend(args.parser)
+    configure_parse_memo(None)  # the same pages over and over would all be memo hits
+    print(f"{args.jobs} concurrent parses, {args.parser}, ticker every {args.tick:g} ms\n")
+    print(f"{'mode':<10}{'total':>10}{'lag p50':>12}{'lag p99':>12}{'lag max':>12}")
+    for mode in args.modes.split(","):
+        configure_parse_pool(mode, args.workers)
+        try:
+            r = asyncio.run(measure(args.jobs, args.tick))
+        finally:
+            shutdown_parse_pool()
+        print(f"{mode:<10}{r['seconds']:>9.2f}s{r['lag_p50']:>10.1f}ms{r['lag_p99']:>10.1f}ms{r['lag_max']:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Offline benchmark for the V-TOP page parsers in services.py.
+
+    python -m bench.parse_bench                      # all pages, all backends
+    python -m bench.parse_bench --only attendance    # cases whose name contains "attendance"
+    python -m bench.parse_bench --json out.json      # save results
+    python -m bench.parse_bench --baseline out.json  # fail on >25% slowdown vs a saved run
+    python -m bench.parse_bench --page marks=debug_marks.html   # add a locally captured page
+
+For every fixture page it checks that each parser backend returns exactly
+what html.parser returns, then reports time per parse (best and median of
+--repeat runs) and peak traced memory. The exit status is non-zero on a
+parity mismatch or a regression against --baseline.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bench import fixtures
+from services import (
+    PARSER_BACKENDS,
+    parseAttendance,
+    parseAttendanceDetail,
+    parseExamSchedule,
+    parseGradeHistory,
+    parseMarks,
+    parseProfile,
+    parseSemesters,
+)
+
+PARSERS = {
+    "profile": parseProfile,
+    "semesters": lambda html, backend=None: parseSemesters(html),
+    "marks": parseMarks,
+    "exams": parseExamSchedule,
+    "attendance": parseAttendance,
+    "attendance_detail": parseAttendanceDetail,
+    "grades": parseGradeHistory,
+}
+
+
+def build_cases(only=None, pages=()):
+    """(case name, parser, html) for every base page, scale-up and captured page."""
+    cases = [(name, PARSERS[name], page()) for name, page in fixtures.BASE.items()]
+    for name, page in fixtures.SCALED.items():
+        endpoint = max((e for e in PARSERS if name.startswith(e)), key=len)
+        cases.append((name, PARSERS[endpoint], page()))
+    for spec in pages:
+        endpoint, _, path = spec.partition("=")
+        with open(path, "r", encoding="utf-8") as f:
+            cases.append((f"{endpoint}:{path}", PARSERS[endpoint], f.read()))
+    if only:
+        cases = [c for c in cases if only in c[0]]
+    return cases
+
+
+def time_parse(parse, html, backend, repeat, number):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            parse(html, backend)
+        samples.append((time.perf_counter() - started) / number * 1000)
+    return min(samples), statistics.median(samples)
+
+
+def peak_memory(parse, html, backend):
+    tracemalloc.start()
+    try:
+        parse(html, backend)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(cases, backends, repeat, number):
+    results, mismatches = [], []
+    for name, parse, html in cases:
+        expected = parse(html, "html.parser")
+        if not expected:
+            mismatches.append(f"{name}: html.parser found nothing on the fixture page")
+        for backend in backends:
+            if parse(html, backend) != expected:
+                mismatches.append(f"{name}: {backend} output differs from html.parser")
+            best, median = time_parse(parse, html, backend, repeat, number)
+            results.append({
+                "case": name, "backend": backend, "bytes": len(html.encode()),
+                "best_ms": round(best, 3), "median_ms": round(median, 3),
+                "peak_kb": round(peak_memory(parse, html, backend) / 1024, 1),
+            })
+    return results, mismatches
+
+
+def print_table(results):
+    base = {r["case"]: r["median_ms"] for r in results if r["backend"] == "html.parser"}
+    print(f"\n   {'CASE':<24} {'KB':>7}  {'BACKEND':<14} {'BEST ms':>9} {'MEDIAN ms':>10} {'PEAK KB':>9} {'SPEEDUP':>8}")
+    print("   " + "-" * 88)
+    for r in results:
+        speedup = f"{base[r['case']] / r['median_ms']:.2f}x" if r["case"] in base and r["median_ms"] else "-"
+        print(f"   {r['case']:<24} {r['bytes'] / 1024:>7.1f}  {r['backend']:<14} {r['best_ms']:>9.3f} "
+              f"{r['median_ms']:>10.3f} {r['peak_kb']:>9.1f} {speedup:>8}")
+    print("   " + "-" * 88)
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, "r") as f:
+        baseline = {(r["case"], r["backend"]): r for r in json.load(f)}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["case"], r["backend"]))
+        if old and r["median_ms"] > old["median_ms"] * (1 + threshold):
+            regressions.append(f"{r['case']} [{r['backend']}]: {old['median_ms']:.3f} -> {r['median_ms']:.3f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the V-TOP HTML parsers on fixture pages.")
+    parser.add_argument("--backends", nargs="+", choices=PARSER_BACKENDS, default=list(PARSER_BACKENDS))
+    parser.add_argument("--only", help="Run only cases whose name contains this string.")
+    parser.add_argument("--page", action="append", default=[], metavar="ENDPOINT=PATH",
+                        help=f"Also benchmark a captured page ({', '.join(PARSERS)}). Repeatable.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=10, help="Parses per timing sample.")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON.")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON from an earlier run to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs. baseline (default: 0.25).")
+    args = parser.parse_args(argv)
+
+    backends = ["html.parser"] + [b for b in args.backends if b != "html.parser"]
+    results, mismatches = run(build_cases(args.only, args.page), backends, args.repeat, args.number)
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"   [+] Results written to {args.json}")
+
+    failures = list(mismatches)
+    if args.baseline:
+        failures += [f"regression: {r}" for r in compare(results, args.baseline, args.threshold)]
+    for failure in failures:
+        print(f"   [!] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import copy
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# ==========================================
+# 💾 PERSISTENT RESPONSE CACHE
+# ==========================================
+# Parsed V-TOP results are stored in a small SQLite file, keyed by
+# endpoint + register number + semesterSubId (+ any extra call arguments,
+# e.g. the course id of an attendance drill-down).
+
+STATE_DIR = ".vtop"
+CACHE_PATH = os.path.join(STATE_DIR, "responses.db")
+PARSE_MEMO_PATH = os.path.join(STATE_DIR, "parsed.db")
+
+# Seconds a cached result counts as fresh, per endpoint. Data that changes
+# once a semester (profile, transcript, semester list, timetable) lives long;
+# attendance and marks are refreshed often.
+DEFAULT_TTLS: Dict[str, int] = {
+    "profile": 7 * 24 * 3600,
+    "grades": 24 * 3600,
+    "semesters": 24 * 3600,
+    "timetable": 24 * 3600,
+    "exams": 3600,
+    "marks": 30 * 60,
+    "attendance": 15 * 60,
+    "attendance_detail": 15 * 60,
+}
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# Stale entries older than this are never served, even in stale-while-revalidate mode.
+DEFAULT_MAX_STALE = 7 * 24 * 3600
+
+
+def ensure_state_dir(path: str = STATE_DIR) -> str:
+    """Creates the private state directory (owner-only access)."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    try: os.chmod(path, 0o700)
+    except OSError: pass
+    return path
+
+
+class ResponseCache:
+    def __init__(self, path: str = CACHE_PATH, ttls: Optional[Dict[str, int]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, stale_while_revalidate: bool = False,
+                 max_stale: int = DEFAULT_MAX_STALE):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls: self.ttls.update(ttls)
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale
+
+        ensure_state_dir(os.path.dirname(path) or ".")
+        self._db = sqlite3.connect(path)
+        try: os.chmod(path, 0o600)
+        except OSError: pass
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint    TEXT NOT NULL,
+                reg_no      TEXT NOT NULL,
+                semester    TEXT NOT NULL,
+                extra       TEXT NOT NULL,
+                body        TEXT NOT NULL,
+                stored_at   REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, reg_no, semester, extra)
+            )
+        """)
+        self._db.commit()
+
+    def ttl(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint, 0)
+
+    def get(self, endpoint: str, reg_no: str, semester: str = "", extra: Tuple = ()) -> Optional[Tuple[Any, bool]]:
+        """Returns (value, is_fresh), or None when nothing usable is cached."""
+        key = (endpoint, reg_no, semester or "", json.dumps(list(extra)))
+        row = self._db.execute(
+            "SELECT body, stored_at FROM responses WHERE endpoint=? AND reg_no=? AND semester=? AND extra=?", key
+        ).fetchone()
+        if not row:
+            return None
+
+        age = time.time() - row[1]
+        if age > self.ttl(endpoint) + self.max_stale:
+            return None
+
+        self._db.execute(
+            "UPDATE responses SET accessed_at=? WHERE endpoint=? AND reg_no=? AND semester=? AND extra=?",
+            (time.time(), *key)
+        )
+        self._db.commit()
+        return json.loads(row[0]), age <= self.ttl(endpoint)
+
+    def put(self, endpoint: str, reg_no: str, semester: str, extra: Tuple, value: Any) -> None:
+        now = time.time()
+        body = json.dumps(value, default=str)
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (endpoint, reg_no, semester or "", json.dumps(list(extra)), body, now, now)
+        )
+        self._evict()
+        self._db.commit()
+
+    def _evict(self) -> None:
+        """Drops least-recently-used entries until the store fits in max_bytes."""
+        total = self._db.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT rowid, LENGTH(body) FROM responses ORDER BY accessed_at").fetchall()
+        for rowid, size in rows:
+            if total <= self.max_bytes: break
+            self._db.execute("DELETE FROM responses WHERE rowid=?", (rowid,))
+            total -= size
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM responses")
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# ==========================================
+# 🧠 PARSE MEMO
+# ==========================================
+# Parsed results keyed by a hash of the HTML they came from (plus parser
+# and backend). A page that comes back byte-for-byte the same - transcript,
+# profile, exam schedule - skips parsing entirely. Memory is a bounded LRU;
+# an optional SQLite file keeps the memo across launches.
+
+PARSE_MEMO_ENTRIES = 256
+PARSE_MEMO_DISK_ENTRIES = 2048
+
+
+class ParseMemo:
+    def __init__(self, max_entries: int = PARSE_MEMO_ENTRIES, path: Optional[str] = None,
+                 max_disk_entries: int = PARSE_MEMO_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = self.disk_hits = self.misses = 0
+        self._db = None
+        if path:
+            ensure_state_dir(os.path.dirname(path) or ".")
+            self._db = sqlite3.connect(path)
+            try: os.chmod(path, 0o600)
+            except OSError: pass
+            self._db.execute("CREATE TABLE IF NOT EXISTS parsed (key TEXT PRIMARY KEY, body TEXT NOT NULL, stored_at REAL NOT NULL)")
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """A private copy of the memoized result, or None (counted as a miss)."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self.entries[key])
+        if self._db is not None:
+            row = self._db.execute("SELECT body FROM parsed WHERE key=?", (key,)).fetchone()
+            if row:
+                value = json.loads(row[0])
+                self._remember(key, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return copy.deepcopy(value)
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, copy.deepcopy(value))
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?)",
+                             (key, json.dumps(value, default=str), time.time()))
+            self._db.execute("DELETE FROM parsed WHERE key NOT IN "
+                             "(SELECT key FROM parsed ORDER BY stored_at DESC LIMIT ?)", (self.max_disk_entries,))
+            self._db.commit()
+
+    def _remember(self, key: str, value: Any) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import policy
+from cache import ParseMemo
+from services import (
+    SEMESTER_SCOPED,
+    configure_cache,
+    configure_parse_memo,
+    configure_parse_pool,
+    fetchMany,
+    fetchSemesters,
+    openClient,
+    set_parser_backend,
+    shutdown_parse_pool,
+    silence_logs,
+    vtopSessionLogin,
+)
+
+# ==========================================
+# 🏭 SHARDED HARVEST (--batch --workers N)
+# ==========================================
+# Thousands of accounts are more parsing than one event loop can keep up
+# with, so the account list is split across worker processes, each running
+# its own loop of VtopClient sessions (--batch-concurrency per worker).
+# Every worker has its own queue; one that runs dry takes accounts from the
+# longest other queue, so a shard full of slow accounts does not hold up
+# the run. Each finished (account, endpoint, semester) unit goes back to the
+# parent, which is the only writer of the JSONL journal. Running the same
+# command again with the same journal skips every unit already in it; a
+# unit records the semester it was fetched for, so without --semester a
+# worker first resolves the account's latest semester and only skips the
+# units done for that one (a new semester may have started since).
+# Empty answers are not counted as done (V-TOP errors also come back empty),
+# so they are fetched again on resume. Workers start from scratch (spawn),
+# so the parent's command-line settings reach them as a WorkerSettings.
+
+WORKERS = os.cpu_count() or 2
+JOURNAL_PATH = "harvest.jsonl"
+POLL_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class WorkerSettings:
+    parser: str = "html.parser"
+    parse_pool: str = "inline"          # "thread" or "inline": workers cannot start processes of their own
+    parse_workers: Optional[int] = None
+    parse_memo: bool = True             # in memory only; one SQLite file is not meant for many writers
+    upstream_concurrency: Optional[int] = None  # per worker; None means unlimited
+    hedge: Optional[bool] = None
+    retries: Optional[int] = None
+    deadline: Optional[float] = None
+
+
+# --- journal ---
+def load_journal(path: str) -> Set[Tuple[str, str, Optional[str]]]:
+    """(account, endpoint, semester) units completed in an earlier run."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            if entry.get("ok") and "endpoint" in entry:
+                done.add((entry["account"], entry["endpoint"], entry.get("semester")))
+    return done
+
+
+def pending_commands(reg_no: str, commands: List[str], semester: Optional[str],
+                     done: Set[Tuple[str, str, Optional[str]]]) -> List[str]:
+    """
+    The commands without a completed unit for `semester`. With no semester
+    (the latest one, unknown until the account has logged in) every
+    semester-scoped command is still pending.
+    """
+    def finished(name):
+        if name not in SEMESTER_SCOPED:
+            return (reg_no, name, None) in done
+        return bool(semester) and (reg_no, name, semester) in done
+    return [c for c in commands if not finished(c)]
+
+
+# --- worker process ---
+def _take(index: int, queues) -> Tuple[Optional[tuple], bool]:
+    """Next account from this worker's own queue, else stolen from the longest other one."""
+    try:
+        return queues[index].get_nowait(), False
+    except queue.Empty:
+        pass
+    while True:
+        others = sorted((q for i, q in enumerate(queues) if i != index), key=lambda q: q.qsize(), reverse=True)
+        if not others or others[0].qsize() == 0:
+            return None, False
+        try:
+            return others[0].get_nowait(), True
+        except queue.Empty:
+            continue  # someone else got there first
+
+
+async def _work(index: int, queues, results, semester: Optional[str], base_url: Optional[str],
+                concurrency: int, persist: bool, upstream: Optional[int]) -> Dict[str, Any]:
+    silence_logs()
+    policy.limit_upstream(upstream)  # on this loop
+    stats = {"worker": index, "accounts": 0, "stolen": 0, "units": 0}
+
+    async def harvest(reg_no: str, password: str, commands: List[str], done: Set[Tuple[str, str, Optional[str]]]):
+        def on_result(name, scoped, result):
+            stats["units"] += 1
+            results.put(("unit", {
+                "account": reg_no, "endpoint": name, "semester": scoped, "ok": bool(result),
+                "worker": index, "at": datetime.now().isoformat(timespec="seconds"), "data": result,
+            }))
+
+        try:
+            async with openClient(reg_no, password, base_url) as client:
+                if not await vtopSessionLogin(client, password, persist=persist):
+                    results.put(("account", {"account": reg_no, "error": "login failed"}))
+                    return
+                scoped = semester
+                if not scoped and any(c in SEMESTER_SCOPED for c in commands):
+                    semesters = await fetchSemesters(client)
+                    scoped = semesters[0]["id"] if semesters else None
+                    commands = pending_commands(reg_no, commands, scoped, done)
+                if commands:
+                    await fetchMany(client, commands, scoped, on_result)
+        except Exception as e:
+            results.put(("account", {"account": reg_no, "error": str(e) or type(e).__name__}))
+
+    async def runner():
+        loop = asyncio.get_running_loop()
+        while True:
+            # Manager queues are proxies: every call is a round trip, so keep it off the loop
+            item, stolen = await loop.run_in_executor(None, _take, index, queues)
+            if item is None:
+                return
+            stats["accounts"] += 1
+            stats["stolen"] += stolen
+            await harvest(*item)
+
+    await asyncio.gather(*(runner() for _ in range(max(1, concurrency))))
+    return stats
+
+
+def _worker(index: int, queues, results, semester, base_url, concurrency, persist,
+            settings: WorkerSettings) -> None:
+    # Ctrl+C goes to the parent, which stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_parser_backend(settings.parser)
+    configure_parse_pool(settings.parse_pool, settings.parse_workers)
+    configure_parse_memo(ParseMemo() if settings.parse_memo else None)
+    policy.configure(hedge=settings.hedge, retries=settings.retries, deadline=settings.deadline)
+    configure_cache(None)  # one SQLite cache file is not meant for many writer processes
+    try:
+        stats = asyncio.run(_work(index, queues, results, semester, base_url, concurrency, persist,
+                                  settings.upstream_concurrency))
+    finally:
+        shutdown_parse_pool()
+    results.put(("done", stats))
+
+
+# --- parent ---
+def run_harvest(accounts: List[Tuple[str, str]], commands: List[str], semester: Optional[str] = None,
+                workers: int = WORKERS, concurrency: int = 8, journal: str = JOURNAL_PATH,
+                base_url: Optional[str] = None, persist: bool = True,
+                settings: WorkerSettings = WorkerSettings()) -> int:
+    started = time.perf_counter()
+    done = load_journal(journal)
+    done_by_account: Dict[str, Set[Tuple[str, str, Optional[str]]]] = {}
+    for unit in done:
+        done_by_account.setdefault(unit[0], set()).add(unit)
+    work = [(reg_no, password, pending_commands(reg_no, commands, semester, done), done_by_account.get(reg_no, set()))
+            for reg_no, password in accounts]
+    work = [item for item in work if item[2]]
+    if done:
+        print(f"[-] Resuming from {journal}: {len(done)} units done, "
+              f"{len(accounts) - len(work)} accounts complete.", file=sys.stderr)
+    if not work:
+        print("[+] Nothing left to harvest.", file=sys.stderr)
+        return 0
+
+    workers = max(1, min(workers, len(work)))
+    print(f"[-] Harvest: {len(work)} accounts over {workers} processes, "
+          f"{concurrency} sessions each, journal {journal}...", file=sys.stderr)
+    ctx = multiprocessing.get_context("spawn")
+    manager = ctx.Manager()
+    queues = [manager.Queue() for _ in range(workers)]
+    # Biggest accounts first, dealt round-robin, so the shards start out even
+    work.sort(key=lambda item: len(item[2]), reverse=True)
+    for i, item in enumerate(work):
+        queues[i % workers].put(item)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, name=f"harvest-{i}", daemon=True,
+                                args=(i, queues, results, semester, base_url, concurrency, persist, settings))
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+
+    units = failed_units = failed_accounts = 0
+    finished: List[Dict[str, Any]] = []
+    try:
+        with open(journal, "a", encoding="utf-8") as out:
+            while len(finished) < workers:
+                try:
+                    kind, record = results.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in processes):
+                        break  # a worker died without reporting; its in-flight units run again on resume
+                    continue
+                if kind == "done":
+                    finished.append(record)
+                    continue
+                out.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+                out.flush()
+                if kind == "unit":
+                    units += 1
+                    failed_units += not record["ok"]
+                else:
+                    failed_accounts += 1
+                    print(f"   [{record['account']}] FAILED ({record['error']})", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\n[!] Harvest interrupted; run the same command again to resume.", file=sys.stderr)
+        return 130
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        manager.shutdown()
+
+    stolen = sum(s["stolen"] for s in finished)
+    crashed = workers - len(finished)
+    print(f"[+] Harvest done in {time.perf_counter() - started:.2f}s: {units} units "
+          f"({failed_units} empty), {failed_accounts} accounts failed, {stolen} accounts stolen"
+          + (f", {crashed} worker(s) crashed" if crashed else ""), file=sys.stderr)
+    return 0 if not (failed_units or failed_accounts or crashed) else 2
@@ -0,0 +1,134 @@
+import asyncio
+import email.parser
+import email.policy
+import json
+from http import HTTPStatus
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# ==========================================
+# 🌐 MINIMAL ASYNCIO HTTP/1.1 SERVER
+# ==========================================
+# Just enough HTTP for the local tools (mock V-TOP, JSON API): one handler
+# coroutine per request, keep-alive, urlencoded and multipart form bodies.
+# No extra dependency, so it runs wherever the CLI runs.
+
+MAX_BODY = 4 * 1024 * 1024
+
+
+class Request:
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes, peer=None):
+        self.method = method
+        self.target = target
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = dict(parse_qsl(parts.query))
+        self.headers = headers
+        self.body = body
+        self.peer = peer
+        self.cookies = {}
+        for item in headers.get("cookie", "").split(";"):
+            name, _, value = item.strip().partition("=")
+            if name: self.cookies[name] = value
+        self._form = None
+
+    @property
+    def form(self) -> Dict[str, str]:
+        """Form fields from an urlencoded or multipart/form-data body."""
+        if self._form is None:
+            ctype = self.headers.get("content-type", "")
+            if ctype.startswith("multipart/form-data"):
+                msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                    b"Content-Type: " + ctype.encode() + b"\r\n\r\n" + self.body)
+                self._form = {
+                    part.get_param("name", header="content-disposition"): part.get_content()
+                    for part in msg.iter_parts()
+                }
+            else:
+                self._form = dict(parse_qsl(self.body.decode("utf-8", "replace")))
+        return self._form
+
+
+class Response:
+    def __init__(self, status: int = 200, body=b"", content_type: str = "text/html; charset=utf-8",
+                 headers: Optional[Dict[str, str]] = None):
+        self.status = status
+        self.body = body.encode() if isinstance(body, str) else body
+        self.headers = {"Content-Type": content_type}
+        self.headers.update(headers or {})
+        self.cookies = []
+
+    def set_cookie(self, name: str, value: str, path: str = "/") -> "Response":
+        self.cookies.append(f"{name}={value}; Path={path}; HttpOnly")
+        return self
+
+    def encode(self, keep_alive: bool) -> bytes:
+        reason = HTTPStatus(self.status).phrase if self.status in HTTPStatus._value2member_map_ else ""
+        lines = [f"HTTP/1.1 {self.status} {reason}"]
+        headers = dict(self.headers)
+        headers["Content-Length"] = str(len(self.body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        lines += [f"Set-Cookie: {c}" for c in self.cookies]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + self.body
+
+
+def json_response(data, status: int = 200) -> Response:
+    return Response(status, json.dumps(data, default=str), content_type="application/json")
+
+
+def redirect(location: str, status: int = 302) -> Response:
+    return Response(status, b"", headers={"Location": location})
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+async def _read_request(reader: asyncio.StreamReader, peer) -> Optional[Request]:
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY:
+        raise ValueError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body, peer)
+
+
+async def serve(handler: Handler, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+    """Starts serving `handler` and returns the asyncio server (already listening)."""
+
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader, peer)
+                except (ValueError, asyncio.IncompleteReadError):
+                    writer.write(Response(400, b"Bad Request", "text/plain").encode(False))
+                    break
+                if request is None:
+                    break
+                try:
+                    response = await handler(request)
+                except Exception as e:
+                    response = Response(500, f"Internal error: {e}", "text/plain")
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(on_connection, host, port)
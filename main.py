@@ -1,9 +1,11 @@
 import argparse
 import asyncio
+import contextlib
 import json
 import time
 import sys
 import subprocess
+import threading
 from datetime import datetime
 async def download_core_without_git():
     folder_name = "vitap_vtop_client"
@@ -33,16 +35,43 @@ async def download_core_without_git():
 from vitap_vtop_client.client import VtopClient
 from services import (
     vtopClientLogin,
+    vtopSessionLogin,
     fetchSemesters,
     fetchAttendance,
     fetchAttendanceDetail,
+    fetchAttendanceDetails,
+    syncAttendanceDetails,
+    DETAIL_CONCURRENCY,
+    PARSER_BACKENDS,
+    set_parser_backend,
     fetchMarks,
     fetchTimetable,
     fetchExamSchedule,
     fetchGradeHistory,
     fetchProfile,
-    get_credentials
+    get_credentials,
+    silence_logs,
+    set_log_stream,
+    openClient,
+    fetchMany,
+    DATA_FETCHERS,
+    configure_cache,
+    SINGLE_FLIGHT,
+    SessionKeepAlive,
+    STREAMERS,
+    PARSE_POOLS,
+    configure_parse_pool,
+    shutdown_parse_pool,
+    configure_parse_memo,
+    parse_memo_stats
 )
+from cache import ResponseCache, ParseMemo, DEFAULT_MAX_BYTES, DEFAULT_TTLS, PARSE_MEMO_PATH
+import policy
+import tracing
+from batch import BATCH_CONCURRENCY, read_accounts, run_batch
+from harvest import JOURNAL_PATH, WorkerSettings, run_harvest
+from watch import MAX_INTERVAL, WATCH_INTERVALS, WATCHERS, run_watch
+from server import SERVE_HOST, SERVE_PORT, run_serve
 import os
 
 
@@ -87,6 +116,7 @@ def print_header(title):
     print(f"\n{title}")
     print("=" * 60)
 
+@tracing.traced("render")
 def print_profile(data):
     if not data or not data.get("basic"):
         print("   (No profile data found)")
@@ -116,6 +146,7 @@ def print_profile(data):
     
     print("   " + "=" * 60 + "\n")
 
+@tracing.traced("render")
 def print_grade_history(data):
     if not data or not data.get("courses"):
         print("\n   [!] No grade history found.")
@@ -140,6 +171,7 @@ def print_grade_history(data):
     print(f"   CREDITS REGISTERED    : {s.get('registered')}")
     print(f"   -------------------------------------------\n")
 
+@tracing.traced("render")
 def print_today_schedule(data):
     if not data:
         print("   (No timetable data available)")
@@ -166,7 +198,8 @@ def print_today_schedule(data):
         print(f"   {time_str:<15} {venue:<8} {code:<10} {slot:<10} {name}")
     print("   " + "-" * 60)
 
-async def print_attendance_with_details(client, semester_id, summary_data):
+@tracing.traced("render")
+async def print_attendance_with_details(client, semester_id, summary_data, concurrency=DETAIL_CONCURRENCY):
     if not summary_data:
         print("   (No data found)")
         return
@@ -174,7 +207,22 @@ async def print_attendance_with_details(client, semester_id, summary_data):
     print(f"\n   {'ATTENDANCE REPORT (Detailed History)':^80}")
     print("   " + "=" * 80)
 
-    for sub in summary_data:
+    # Sort Chronologically
+    def safe_date_sort(x):
+        # Trying both common formats to be safe
+        for fmt in ("%d-%m-%Y", "%d-%b-%Y"):
+            try: return datetime.strptime(x['date'], fmt)
+            except: continue
+        return datetime.min
+
+    started = time.perf_counter()
+    serial_seconds = 0.0
+    fetched = stored = 0
+
+    # Histories arrive concurrently but are printed in the summary's order
+    # Unchanged courses come from the local history store without a request
+    async for sub, history, seconds in syncAttendanceDetails(client, semester_id, summary_data, concurrency):
+        serial_seconds += seconds
         code = sub.get('course_code', '-')
         name = sub.get('course_name', '-')
         ctype = sub.get('course_type', '-')
@@ -189,36 +237,33 @@ async def print_attendance_with_details(client, semester_id, summary_data):
         print(f"\n   {status_icon} {code} : {name} ({ctype})")
         print(f"       Attendance: {perc}% ({attended}/{total})")
         
-        c_id = sub.get('course_id')
-        c_type = sub.get('type_code')
-        
-        if c_id and c_type:
-            history = await fetchAttendanceDetail(client, semester_id, c_id, c_type)
-            if history:
-                absents = [h for h in history if "Present" not in h['status']]
-                
-                # Sort Chronologically
-                def safe_date_sort(x):
-                    # Trying both common formats to be safe
-                    for fmt in ("%d-%m-%Y", "%d-%b-%Y"):
-                        try: return datetime.strptime(x['date'], fmt)
-                        except: continue
-                    return datetime.min
-                
-                absents.sort(key=safe_date_sort, reverse=True)
-
-                if absents:
-                    print(f"       [!] Found {len(absents)} Absences:")
-                    for h in absents:
-                         print(f"           {h['date']:<12} {h['slot']:<8} ❌ {h['status']}")
-                else:
-                     print(f"       (History fetched: {len(history)} classes, All Present)")
+        if history is not None:
+            # Store hits cost no request (seconds 0), so they are not "fetched"
+            if seconds > 0: fetched += 1
+            else: stored += 1
+
+        if history is None:
+            print("       [!] Cannot fetch details (ID missing).")
+        elif history:
+            absents = [h for h in history if "Present" not in h['status']]
+            absents.sort(key=safe_date_sort, reverse=True)
+
+            if absents:
+                print(f"       [!] Found {len(absents)} Absences:")
+                for h in absents:
+                     print(f"           {h['date']:<12} {h['slot']:<8} ❌ {h['status']}")
             else:
-                print("       (No history records found)")
+                 print(f"       (History fetched: {len(history)} classes, All Present)")
         else:
-            print("       [!] Cannot fetch details (ID missing).")
+            print("       (No history records found)")
         print("   " + "-" * 40)
 
+    wall = time.perf_counter() - started
+    print(f"\n   Fetched {fetched} course histories in {wall:.2f}s "
+          f"(one at a time: ~{serial_seconds:.2f}s, concurrency {concurrency})"
+          + (f", {stored} unchanged from the local store" if stored else ""))
+
+@tracing.traced("render")
 def print_attendance(data):
     if not data:
         print("   (No data found)")
@@ -257,6 +302,7 @@ def print_attendance(data):
     
     print("   " + "─" * 70)
 
+@tracing.traced("render")
 def print_marks(data):
     if not data or "courses" not in data:
         print("   (No marks found)")
@@ -285,6 +331,7 @@ def print_marks(data):
                 print(f"   {'':<10} {'':<35} {m_title:<20} {score:<8} {max_m}")
         print("   " + "-" * 85)
 
+@tracing.traced("render")
 def print_timetable(data):
     if not data:
         print("   (No timetable found)")
@@ -309,6 +356,7 @@ def print_timetable(data):
             print(f"   {time_str:<15} {venue:<8} {code:<10} {slot:<15} {name}")
         print("")
 
+@tracing.traced("render")
 def print_exam_schedule(data):
     if not data:
         print("   (No exams scheduled)")
@@ -331,6 +379,7 @@ def print_exam_schedule(data):
         print(f"   {date:<12} {time:<20} {code:<10} {cid:<15} {etype:<8} {venue:<8} {title}")
     print("   " + "-" * 110)
 
+@tracing.traced("render")
 def print_attendance_history(name, history):
     if not history:
         print("   [!] No records found.")
@@ -351,40 +400,440 @@ def print_attendance_history(name, history):
         print(f"   {entry['date']:<15} {entry['slot']:<15} {status}")
     print(f"   {'─'*60}")
 # ==========================================
+#  BACKGROUND PREFETCH
+# ==========================================
+# Upper bound on simultaneous prefetch requests against V-TOP.
+PREFETCH_CONCURRENCY = 4
+
+class SemesterPrefetch:
+    """Fetches all semester-scoped data concurrently right after a semester is
+    chosen, so the first visit to each of menu options 3-7 is instant."""
+
+    FETCHERS = {
+        "attendance": fetchAttendance,
+        "marks": fetchMarks,
+        "exams": fetchExamSchedule,
+        "timetable": fetchTimetable,
+    }
+
+    def __init__(self, client, semester_id, concurrency=PREFETCH_CONCURRENCY):
+        self.client = client
+        self.semester_id = semester_id
+        self._limit = asyncio.Semaphore(concurrency)
+        self._tasks = {}
+
+    def start(self):
+        for key, fetcher in self.FETCHERS.items():
+            self._tasks[key] = asyncio.create_task(self._run(fetcher))
+        return self
+
+    async def _run(self, fetcher):
+        # Runs in its own task, so this only mutes the prefetch output.
+        silence_logs()
+        async with self._limit:
+            return await fetcher(self.client, self.semester_id)
+
+    async def get(self, key):
+        """
+        The prefetched result the first time (waiting for it if still in
+        flight); later calls go through the cached fetcher, so TTLs apply.
+        """
+        task = self._tasks.pop(key, None)
+        if task is not None and not task.cancelled():
+            try:
+                return await task
+            except asyncio.CancelledError:
+                if not task.cancelled(): raise
+            except Exception:
+                pass
+        # Already used, not prefetched, or the prefetch died: fetch normally.
+        return await self.FETCHERS[key](self.client, self.semester_id)
+
+    def cancel(self):
+        for task in self._tasks.values():
+            if not task.done(): task.cancel()
+
+# Keep-alive stops after this much time without any menu input
+KEEPALIVE_IDLE = 30 * 60
+
+# How long the banner waits for the background profile fetch to show the name
+PROFILE_GRACE = 0.3
+
+async def deferred(fetcher, *args):
+    """Runs a fetcher as background work (its progress output is muted)."""
+    silence_logs()
+    return await fetcher(*args)
+
+async def deferred_result(task, fetcher, *args):
+    """The background task's result, or a foreground fetch if it failed or came back empty."""
+    try:
+        result = await task
+    except Exception:
+        result = None
+    return result or await fetcher(*args)
+
+def profile_name(task):
+    if not task.done() or task.cancelled() or task.exception():
+        return None
+    return (task.result() or {}).get("basic", {}).get("name")
+
+class StartupTimings:
+    """Wall-clock checkpoints from launch to the first menu (--timings)."""
+
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+        self.steps = []
+        self.pending = True
+
+    def mark(self, step):
+        now = time.perf_counter()
+        self.steps.append((step, now - self.last))
+        self.last = now
+
+    def report(self):
+        self.pending = False
+        steps = ", ".join(f"{name} {secs:.2f}s" for name, secs in self.steps)
+        print(f"\n[⏱] Time to first menu: {self.last - self.started:.2f}s ({steps})")
+
+# ==========================================
+# ⌨️ NON-BLOCKING STDIN
+# ==========================================
+# Every prompt reads through one line reader on the event loop, so the
+# prefetch, session refreshes and stale-cache revalidation keep running while
+# the user reads the screen. On POSIX stdin is watched with add_reader();
+# where that is not possible (Windows consoles, regular files) a daemon
+# thread feeds the same queue, and it never holds up the exit.
+class AsyncStdin:
+    def __init__(self):
+        self.lines = None
+        self.eof = False
+        self._fd = None
+        self._pending = b""
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self.lines = asyncio.Queue()
+        try:
+            fd = sys.stdin.fileno()
+            loop.add_reader(fd, self._on_readable, fd)
+            self._fd = fd
+        except (AttributeError, ValueError, OSError, NotImplementedError):
+            threading.Thread(target=self._pump, args=(loop,), daemon=True).start()
+
+    def _on_readable(self, fd):
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            asyncio.get_running_loop().remove_reader(fd)
+            self._fd = None
+            if self._pending:
+                self.lines.put_nowait(self._pending.decode("utf-8", "replace"))
+            self.lines.put_nowait(None)
+            return
+        *complete, self._pending = (self._pending + chunk).split(b"\n")
+        for line in complete:
+            self.lines.put_nowait(line.rstrip(b"\r").decode("utf-8", "replace"))
+
+    def _pump(self, loop):
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(self.lines.put_nowait, line.rstrip("\r\n"))
+        loop.call_soon_threadsafe(self.lines.put_nowait, None)
+
+    async def readline(self, prompt=""):
+        """Next line without the newline; "" once stdin is closed (check .eof)."""
+        if self.lines is None:
+            self.start()
+        if self.eof:
+            return ""
+        print(prompt, end="", flush=True)
+        line = await self.lines.get()
+        if line is None:
+            self.eof = True
+            print()
+            return ""
+        return line
+
+    def close(self):
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            self._fd = None
+
+STDIN = AsyncStdin()
+
+async def ainput(prompt=""):
+    """input() that keeps the event loop running."""
+    return await STDIN.readline(prompt)
+
+# ==========================================
+#  NON-INTERACTIVE COMMANDS
+# ==========================================
+def emit_ndjson(name, semester, result):
+    # Lists become one line per item so consumers can start on the first row
+    for item in (result if isinstance(result, list) else [result]):
+        sys.stdout.write(json.dumps({"type": name, "semester": semester, "data": item},
+                                    default=str, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+async def run_commands(client, commands, semester=None, fmt="json", stream=False):
+    """Fetches only the requested data, concurrently, and writes it to stdout."""
+    if stream:
+        return await stream_commands(client, commands, semester)
+    on_result = emit_ndjson if fmt == "ndjson" else None
+    document = await fetchMany(client, commands, semester, on_result)
+    if fmt == "json":
+        json.dump(document, sys.stdout, indent=2, default=str, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0
+
+async def stream_commands(client, commands, semester=None):
+    """NDJSON where attendance/marks/exams rows are written while their page is still downloading."""
+    streamed = [c for c in commands if c in STREAMERS]
+    if streamed and not semester:
+        semester = (await fetchSemesters(client))[0]['id']
+
+    async def stream_one(name):
+        try:
+            async with contextlib.aclosing(STREAMERS[name](client, semester)) as items:
+                async for item in items:
+                    emit_ndjson(name, semester, item)
+        except Exception as e:
+            print(f"   [!] {name} stream error: {e}", file=sys.stderr)
+
+    rest = [c for c in commands if c not in STREAMERS]
+    jobs = [stream_one(name) for name in streamed]
+    if rest:
+        jobs.append(fetchMany(client, rest, semester, emit_ndjson))
+    await asyncio.gather(*jobs)
+    return 0
+
+# ==========================================
+#  COMMAND LINE OPTIONS
+# ==========================================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="VIT-AP V-TOP CLI Dashboard",
+        epilog="Without a command the interactive menu starts. With one or more data commands "
+               "the CLI logs in, fetches just those (concurrently), prints JSON and exits."
+    )
+    parser.add_argument("commands", nargs="*", metavar="COMMAND",
+                        help=f"Data to fetch: {', '.join(DATA_FETCHERS)}. "
+                             f"Or 'watch [{' '.join(WATCHERS)}]' to keep polling and print only changes, "
+                             f"or 'serve' to answer them as a local JSON API.")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json",
+                        help="Output of data commands: one JSON document, or one record per line as results arrive.")
+    parser.add_argument("--stream", action="store_true",
+                        help=f"With NDJSON, write {'/'.join(STREAMERS)} rows as soon as each is parsed, "
+                             f"while the page is still downloading (implies --format ndjson).")
+    parser.add_argument("--semester", metavar="SEM_SUB_ID",
+                        help="semesterSubId for attendance/marks/exams/timetable (default: latest semester).")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", metavar="FILE",
+                       help="Run the data commands for every 'REGNO,PASSWORD' line of FILE instead of credentials.txt.")
+    batch.add_argument("--batch-concurrency", type=int, default=BATCH_CONCURRENCY, metavar="N",
+                       help=f"Accounts with an open session at the same time (default: {BATCH_CONCURRENCY}), per worker with --workers.")
+    batch.add_argument("--workers", type=int, metavar="N",
+                       help="Split the accounts over N processes, each with its own event loop (implies --journal).")
+    batch.add_argument("--journal", nargs="?", const=JOURNAL_PATH, metavar="FILE",
+                       help=f"Write each finished account/endpoint/semester to FILE as JSONL (default: {JOURNAL_PATH}) "
+                            f"and skip those already in it, so an interrupted harvest resumes where it stopped.")
+    cache = parser.add_argument_group("response cache")
+    cache.add_argument("--no-cache", action="store_true",
+                       help="Always fetch from V-TOP instead of the local response cache.")
+    cache.add_argument("--stale-while-revalidate", action="store_true",
+                       help="Show expired cached data immediately and refresh it in the background.")
+    cache.add_argument("--cache-ttl", action="append", default=[], metavar="ENDPOINT=SECONDS",
+                       help=f"Override a cache TTL ({', '.join(DEFAULT_TTLS)}). Repeatable.")
+    cache.add_argument("--no-parse-memo", action="store_true",
+                       help="Parse every page, even one identical to a page parsed before.")
+    cache.add_argument("--parse-memo-disk", action="store_true",
+                       help=f"Also keep parsed pages in {PARSE_MEMO_PATH} between launches.")
+    cache.add_argument("--cache-max-mb", type=float,
+                       help=f"Size limit of the cache file before old entries are evicted (default: {DEFAULT_MAX_BYTES // 2**20}).")
+    requests = parser.add_argument_group("request policy")
+    requests.add_argument("--hedge", action="store_true",
+                          help="Send a second copy of a request that is slower than its endpoint's recent p95.")
+    requests.add_argument("--retries", type=int, metavar="N",
+                          help=f"Retries for timeouts, connection errors and 5xx answers (default: {policy.DEFAULT_POLICY.retries}).")
+    requests.add_argument("--deadline", type=float, metavar="SECONDS",
+                          help=f"Overall time limit per request, retries included (default: {policy.DEFAULT_POLICY.deadline:.0f}).")
+    session = parser.add_argument_group("saved session")
+    session.add_argument("--no-session", action="store_true",
+                         help="Do not reuse or save the login session between launches.")
+    session.add_argument("--keepalive", type=float, default=0, metavar="SECONDS",
+                         help="Keep the session warm with a cheap request every SECONDS of inactivity (default: off).")
+    session.add_argument("--idle-timeout", type=float, default=KEEPALIVE_IDLE, metavar="SECONDS",
+                         help=f"Stop the keep-alive after this long without input (default: {KEEPALIVE_IDLE:.0f}).")
+    watch = parser.add_argument_group("watch mode")
+    watch.add_argument("--hook", metavar="CMD",
+                       help="Run CMD for every change (event JSON on stdin) instead of printing NDJSON.")
+    watch.add_argument("--interval", action="append", default=[], metavar="ENDPOINT=SECONDS",
+                       help=f"Base polling interval per endpoint (defaults: "
+                            f"{', '.join(f'{k}={v}' for k, v in WATCH_INTERVALS.items())}). Repeatable.")
+    watch.add_argument("--metrics-file", metavar="PATH",
+                       help="Rewrite PATH with Prometheus metrics after every poll (node_exporter textfile format).")
+    watch.add_argument("--max-interval", type=float, default=MAX_INTERVAL, metavar="SECONDS",
+                       help=f"Longest interval an unchanged endpoint backs off to (default: {MAX_INTERVAL}).")
+    serve = parser.add_argument_group("serve mode")
+    serve.add_argument("--host", default=SERVE_HOST, help=f"Address the JSON API listens on (default: {SERVE_HOST}).")
+    serve.add_argument("--port", type=int, default=SERVE_PORT, help=f"Port of the JSON API (default: {SERVE_PORT}).")
+    serve.add_argument("--upstream-concurrency", type=int, metavar="N",
+                       help=f"Most requests sent to V-TOP at once, however many clients ask (default: {policy.UPSTREAM_CONCURRENCY}). "
+                            f"Also applies per worker with --workers (default there: unlimited).")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="Send all V-TOP traffic to this server instead (e.g. mock_server.py).")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default="html.parser",
+                        help="HTML parser backend used for V-TOP pages (default: html.parser).")
+    parser.add_argument("--parse-pool", choices=PARSE_POOLS, default="inline",
+                        help="Where pages are parsed: on the event loop (default), a thread pool or a process pool.")
+    parser.add_argument("--parse-workers", type=int, metavar="N",
+                        help="Size of the --parse-pool (default: Python's executor default).")
+    parser.add_argument("--timings", action="store_true",
+                        help="Show how long startup took until the first menu appeared.")
+    parser.add_argument("--trace", nargs="?", const=tracing.DEFAULT_TRACE_PATH, metavar="FILE",
+                        help=f"Record a span for every login step, request, parse and render; write them as a "
+                             f"Chrome trace (default file: {tracing.DEFAULT_TRACE_PATH}) and print a summary at exit.")
+    parser.add_argument("--detail-concurrency", type=int, default=DETAIL_CONCURRENCY, metavar="N",
+                        help=f"Parallel attendance history requests for the 'A' drill-down (default: {DETAIL_CONCURRENCY}).")
+    args = parser.parse_args(argv)
+
+    args.mode = None
+    known = DATA_FETCHERS
+    if args.commands[:1] == ["watch"]:
+        args.mode, args.commands, known = "watch", args.commands[1:] or list(WATCHERS), WATCHERS
+    elif args.commands[:1] == ["serve"]:
+        if args.commands[1:]:
+            parser.error("'serve' takes no data commands; clients pick them per request")
+        args.mode, args.commands = "serve", []
+    if args.retries is not None and args.retries < 0:
+        parser.error("--retries cannot be negative")
+    if args.deadline is not None and args.deadline <= 0:
+        parser.error("--deadline must be positive")
+    unknown = [c for c in args.commands if c not in known]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)} (choose from {', '.join(known)})")
+    if args.stream:
+        if args.batch or args.mode:
+            parser.error("--stream only applies to plain data commands")
+        args.format = "ndjson"
+    if args.mode and args.batch:
+        parser.error(f"--batch cannot be combined with '{args.mode}'")
+    if (args.workers or args.journal) and not args.batch:
+        parser.error("--workers and --journal need --batch")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers and not args.journal:
+        args.journal = JOURNAL_PATH
+    if args.journal:
+        # Harvest workers have no response cache and cannot start processes of their own
+        shared = [flag for flag, given in (("--stale-while-revalidate", args.stale_while_revalidate),
+                                           ("--cache-ttl", args.cache_ttl),
+                                           ("--cache-max-mb", args.cache_max_mb is not None),
+                                           ("--parse-memo-disk", args.parse_memo_disk),
+                                           ("--parse-pool process", args.parse_pool == "process")) if given]
+        if shared:
+            parser.error(f"{', '.join(shared)} cannot be combined with --workers/--journal")
+    if args.batch and not args.commands:
+        parser.error("--batch needs at least one data command, e.g. 'attendance marks'")
+    return args
+
+def parse_intervals(specs):
+    intervals = {}
+    for spec in specs:
+        endpoint, _, seconds = spec.partition("=")
+        try:
+            if endpoint not in WATCHERS or float(seconds) <= 0:
+                raise ValueError
+            intervals[endpoint] = float(seconds)
+        except ValueError:
+            print(f"[!] Ignoring invalid --interval '{spec}'", file=sys.stderr)
+    return intervals
+
+def build_cache(args):
+    if args.no_cache:
+        return None
+    ttls = {}
+    for spec in args.cache_ttl:
+        endpoint, _, seconds = spec.partition("=")
+        if endpoint not in DEFAULT_TTLS or not seconds.isdigit():
+            print(f"[!] Ignoring invalid --cache-ttl '{spec}'")
+            continue
+        ttls[endpoint] = int(seconds)
+    return ResponseCache(
+        ttls=ttls,
+        max_bytes=int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb is not None else DEFAULT_MAX_BYTES,
+        stale_while_revalidate=args.stale_while_revalidate
+    )
+
+# ==========================================
 #  MAIN CLI LOGIC
 # ==========================================
-async def main():
+def main_sharded(args):
+    """--batch with --journal/--workers. Runs outside asyncio.run(): each worker has its own loop."""
+    set_log_stream(sys.stderr)
+    # Nothing configured here reaches the workers; they apply these themselves
+    settings = WorkerSettings(
+        parser=args.parser, parse_pool=args.parse_pool, parse_workers=args.parse_workers,
+        parse_memo=not args.no_parse_memo, upstream_concurrency=args.upstream_concurrency,
+        hedge=args.hedge or None, retries=args.retries, deadline=args.deadline,
+    )
+    return run_harvest(read_accounts(args.batch), args.commands, args.semester, args.workers or 1,
+                       args.batch_concurrency, args.journal, args.base_url,
+                       persist=not args.no_session, settings=settings)
+
+async def main(args):
+    timings = StartupTimings()
+    set_parser_backend(args.parser)
+    configure_parse_pool(args.parse_pool, args.parse_workers)
+    configure_cache(build_cache(args))
+    configure_parse_memo(None if args.no_parse_memo else
+                         ParseMemo(path=PARSE_MEMO_PATH if args.parse_memo_disk else None))
+    policy.configure(hedge=args.hedge or None, retries=args.retries, deadline=args.deadline)
+
+    if args.batch:
+        set_log_stream(sys.stderr)
+        accounts = read_accounts(args.batch)
+        print(f"[-] Batch: {len(accounts)} accounts, {args.batch_concurrency} at a time...", file=sys.stderr)
+        return await run_batch(accounts, args.commands, args.semester, args.format,
+                               args.batch_concurrency, args.base_url, persist=not args.no_session)
+
     reg_no, password = get_credentials("credentials.txt")
-    print(f"[-] Connecting to V-TOP as {reg_no}...")
+    # Scripted runs keep stdout for the JSON; everything else goes to stderr
+    status = sys.stderr if args.commands else sys.stdout
+    if args.commands:
+        set_log_stream(sys.stderr)
+    print(f"[-] Connecting to V-TOP as {reg_no}...", file=status)
     
-    async with VtopClient(reg_no, password) as client:
-        if not await vtopClientLogin(client):
-            print(f"[!] Login Failed.")
-            return
-
-        # 1. FORCE DASHBOARD LOAD (The "Unlock" Step)
-        # This tells the server you are officially on the dashboard
-        await client._client.get("https://vtop.vitap.ac.in/vtop/content")
-        
-        # 2. FETCH SEMESTERS FIRST
-        # This is usually the "lighter" request and helps stabilize the CSRF
+    async with openClient(reg_no, password, args.base_url) as client:
+        if not await vtopSessionLogin(client, password, persist=not args.no_session):
+            print(f"[!] Login Failed.", file=status)
+            return 1
+
+        if args.mode == "watch":
+            semester = args.semester or (await fetchSemesters(client))[0]['id']
+            return await run_watch(client, semester, args.commands, parse_intervals(args.interval),
+                                   args.max_interval, args.hook, args.metrics_file)
+        if args.mode == "serve":
+            policy.limit_upstream(policy.UPSTREAM_CONCURRENCY if args.upstream_concurrency is None
+                                  else args.upstream_concurrency)
+            keepalive = SessionKeepAlive(client, args.keepalive, args.idle_timeout) if args.keepalive else None
+            return await run_serve(client, reg_no, args.host, args.port, keepalive)
+        if args.commands:
+            return await run_commands(client, args.commands, args.semester, args.format, args.stream)
+
+        # 1. SEMESTERS AND PROFILE TOGETHER
+        # The login (or session probe) already left a CSRF token on the client,
+        # so there is no separate dashboard load. The profile is only needed by
+        # option 1; the banner uses it if it is already there.
+        timings.mark("login")
+        profile_task = asyncio.create_task(deferred(fetchProfile, client))
         available_sems = await fetchSemesters(client)
-        
-        # 3. FETCH PROFILE SECOND
-        # Now that the session is warm, fetch the profile
-        profile_data = await fetchProfile(client)
-        
-        # 4. DATA ASSIGNMENT
-        student_name = profile_data.get("basic", {}).get("name", "Student")
+        timings.mark("semesters")
+        await asyncio.wait({profile_task}, timeout=PROFILE_GRACE)
+
+        # 2. DATA ASSIGNMENT
+        student_name = profile_name(profile_task) or reg_no
         target_sem = available_sems[0]['id'] if available_sems else None
         current_sem_name = available_sems[0]['name'] if available_sems else "None"
 
-        print(f"\n{'='*55}")
-        print(f" SUCCESS  : Logged in as {student_name}")
-        print(f" REG NO   : {reg_no}")
-        print(f" CURR SEM : {current_sem_name}")
-        print(f"{'='*55}")
-
         # 3. DISPLAY SUCCESS DASHBOARD
         print(f"\n{'='*55}")
         print(f" SUCCESS  : Logged in as {student_name}")
@@ -392,8 +841,15 @@ async def main():
         print(f" CURR SEM : {current_sem_name}")
         print(f"{'='*55}")
 
-        # 4. INTERACTIVE LOOP
+        # 5. WARM UP SEMESTER DATA IN THE BACKGROUND
+        prefetch = SemesterPrefetch(client, target_sem).start() if target_sem else None
+        keepalive = SessionKeepAlive(client, args.keepalive, args.idle_timeout).start() if args.keepalive > 0 else None
+
+        # 6. INTERACTIVE LOOP
         while True:
+            if args.timings and timings.pending:
+                timings.mark("menu")
+                timings.report()
             print("\nAVAILABLE OPTIONS:")
             print("  1. View Profile & Proctor Details")
             print("  2. View Grade History (Transcript)")
@@ -405,16 +861,29 @@ async def main():
             print("  8. Change/Select Semester")
             print("  0. Exit")
             
-            choice = input(f"\n[{reg_no}] Enter choice (0-8): ").strip()
+            choice = (await ainput(f"\n[{reg_no}] Enter choice (0-8): ")).strip()
+            if STDIN.eof and not choice:
+                choice = '0'
+            if keepalive: keepalive.touch()
 
             if choice == '0':
+                if prefetch: prefetch.cancel()
+                profile_task.cancel()
+                if keepalive: keepalive.stop()
+                if args.timings:
+                    print(f"[⏱] Fetches shared with one already in flight: {SINGLE_FLIGHT['joined']} "
+                          f"(of {SINGLE_FLIGHT['fetches'] + SINGLE_FLIGHT['joined']} requested)")
+                    memo = parse_memo_stats()
+                    print(f"[⏱] Pages served from the parse memo: {memo['hits']} "
+                          f"(of {memo['hits'] + memo['misses']} parsed)")
                 print("Logging out... Goodbye!")
+                STDIN.close()
                 break
             
             # Choice 1 & 2 are semester-independent
             if choice == '1':
                 print_header("STUDENT PROFILE")
-                print_profile(profile_data)
+                print_profile(await deferred_result(profile_task, fetchProfile, client))
 
             elif choice == '2':
                 print_header("ACADEMIC TRANSCRIPT")
@@ -429,44 +898,44 @@ async def main():
 
                 if choice == '3':
                     # 1. Show the Summary
-                    data = await fetchAttendance(client, target_sem)
+                    data = await prefetch.get("attendance")
                     print_attendance(data) 
                     
                     # 2. Drill Down into Details
                     print("\n   " + "─" * 45)
-                    sel = input("   Select S.No for Detail History (Enter to skip): ").strip()
+                    sel = (await ainput("   Select S.No for Detail History (A for all, Enter to skip): ")).strip()
                     
-                    if sel.isdigit():
+                    if sel.upper() == 'A':
+                        await print_attendance_with_details(client, target_sem, data, args.detail_concurrency)
+                    elif sel.isdigit():
                         idx = int(sel) - 1
                         if 0 <= idx < len(data):
                             course = data[idx]
                             if course.get('course_id'):
                                 print(f"   ...Fetching history for {course['course_id']}...")
-                                history = await fetchAttendanceDetail(
-                                    client, target_sem, course['course_id'], course['type_code']
-                                )
-                                print_attendance_history(course['course_name'], history)
+                                async for _, history, _ in syncAttendanceDetails(client, target_sem, [course]):
+                                    print_attendance_history(course['course_name'], history)
                             else:
                                 print("   [!] No detail link found for this course.")
                 
                 elif choice == '4':
                     print_header(f"FULL TIMETABLE - {current_sem_name}")
-                    data = await fetchTimetable(client, target_sem)
+                    data = await prefetch.get("timetable")
                     print_timetable(data)
 
                 elif choice == '5':
                     print_header(f"TODAY'S SCHEDULE - {current_sem_name}")
-                    data = await fetchTimetable(client, target_sem)
+                    data = await prefetch.get("timetable")
                     print_today_schedule(data)
 
                 elif choice == '6':
                     print_header(f"INTERNAL MARKS - {current_sem_name}")
-                    data = await fetchMarks(client, target_sem)
+                    data = await prefetch.get("marks")
                     print_marks(data)
 
                 elif choice == '7':
                     print_header(f"EXAM SCHEDULE - {current_sem_name}")
-                    data = await fetchExamSchedule(client, target_sem)
+                    data = await prefetch.get("exams")
                     print_exam_schedule(data)
 
             elif choice == '8':
@@ -479,7 +948,7 @@ async def main():
                     for i, s in enumerate(available_sems):
                         print(f"   {i+1}. {s['name']}")
                     
-                    sel = input("\nSelect a semester number (0 to cancel): ").strip()
+                    sel = (await ainput("\nSelect a semester number (0 to cancel): ")).strip()
                     if sel == '0': continue
 
                     try:
@@ -488,15 +957,28 @@ async def main():
                             target_sem = available_sems[idx]['id']
                             current_sem_name = available_sems[idx]['name']
                             print(f"[+] Active Semester set to: {current_sem_name}")
+
+                            # Drop the old semester's in-flight work, warm up the new one
+                            if prefetch: prefetch.cancel()
+                            prefetch = SemesterPrefetch(client, target_sem).start()
                         else:
                             print("[!] Invalid selection.")
                     except ValueError:
                         print("[!] Please enter a valid number.")
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.trace:
+        tracing.enable()
     try:
-        asyncio.run(main())
+        if args.journal:
+            sys.exit(main_sharded(args))
+        sys.exit(asyncio.run(main(args)) or 0)
     except KeyboardInterrupt:
         print("\n[!] Scraper stopped by user.")
     except Exception as e:
-        print(f"\n[!] Fatal Error: {e}")
\ No newline at end of file
+        print(f"\n[!] Fatal Error: {e}")
+    finally:
+        shutdown_parse_pool()
+        if args.trace:
+            tracing.finish(args.trace)
@@ -0,0 +1,147 @@
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# ==========================================
+# 📈 METRICS
+# ==========================================
+# Process-wide counters and latency histograms, rendered in the Prometheus
+# text exposition format. Serve mode answers them on GET /metrics; watch
+# mode can rewrite a file after every poll (--metrics-file) for the
+# node_exporter textfile collector. Recording is a dict lookup and an add.
+
+NETWORK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self.values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()  # parse workers may record from threads
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(k)} {_number(v)}" for k, v in sorted(self.values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name, self.help = name, help
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self.values: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class CounterFunc:
+    """A counter whose values live elsewhere (e.g. policy.STATS); read at render time."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, read: Callable[[], Dict[str, float]], label: str):
+        self.name, self.help, self.read, self.label = name, help, read, label
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(((self.label, str(k)),))} {_number(v)}"
+                for k, v in sorted(self.read().items())]
+
+
+REGISTRY: List = []
+
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def counter(name: str, help: str) -> Counter:
+    return _register(Counter(name, help))
+
+
+def histogram(name: str, help: str, buckets: Sequence[float]) -> Histogram:
+    return _register(Histogram(name, help, buckets))
+
+
+def counter_func(name: str, help: str, read: Callable[[], Dict[str, float]], label: str) -> CounterFunc:
+    return _register(CounterFunc(name, help, read, label))
+
+
+# --- what services.py records ---
+REQUESTS = counter("vtop_requests_total", "V-TOP requests sent, by endpoint and HTTP status (or error type).")
+RESPONSE_BYTES = counter("vtop_response_bytes_total", "Response body bytes received from V-TOP, by endpoint.")
+REQUEST_SECONDS = histogram("vtop_request_seconds", "Network time of one V-TOP request attempt, by endpoint.",
+                            NETWORK_BUCKETS)
+PARSE_SECONDS = histogram("vtop_parse_seconds", "Time spent parsing one page, by parser.", PARSE_BUCKETS)
+PARSE_MEMO = counter("vtop_parse_memo_total", "Parse memo lookups, by result (hit/miss).")
+CACHE_LOOKUPS = counter("vtop_cache_lookups_total", "Response cache lookups, by endpoint and result (hit/stale/miss).")
+LOGINS = counter("vtop_logins_total", "Login attempts, by kind (password/session) and result.")
+CSRF_REFRESHES = counter("vtop_csrf_refreshes_total", "CSRF token refreshes, by whether a re-login was needed.")
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def write_textfile(path: str) -> None:
+    """Atomically replaces `path` with the current metrics (safe for scrapers reading it)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
@@ -0,0 +1,218 @@
+"""
+Local stand-in for V-TOP, for deterministic latency and load testing.
+
+    python mock_server.py --port 8585 --latency 250 --jitter 100 --error-rate 0.02 --csrf-ttl 120
+    python main.py --base-url http://127.0.0.1:8585
+
+Serves the login flow VtopClient walks through and every POST endpoint used
+in services.py, answering with the generated pages from bench/fixtures.py.
+Any username/password/captcha is accepted. Latency, jitter, the share of
+requests answered with a 5xx, and CSRF/session lifetimes are configurable,
+so slow-portal days can be reproduced on demand.
+"""
+import argparse
+import asyncio
+import base64
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import httpd
+from bench import fixtures
+
+# 1x1 GIF standing in for the login captcha (its text is never checked)
+CAPTCHA_GIF = base64.b64encode(
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00"
+    b",\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+).decode()
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 0.0        # mean added delay per request
+    jitter_ms: float = 0.0         # +/- uniform spread around the mean
+    error_rate: float = 0.0        # share of POSTs answered with 503
+    csrf_ttl: float = 0.0          # seconds a CSRF token stays valid (0 = forever)
+    session_ttl: float = 0.0       # seconds of inactivity before logout (0 = never)
+    seed: int = 0
+
+
+@dataclass
+class _Session:
+    csrf: str = field(default_factory=lambda: str(uuid.uuid4()))
+    csrf_issued: float = field(default_factory=time.time)
+    reg_no: str = ""
+    last_seen: float = field(default_factory=time.time)
+
+    def rotate_csrf(self):
+        self.csrf, self.csrf_issued = str(uuid.uuid4()), time.time()
+
+
+class MockVtop:
+    def __init__(self, config: Optional[MockConfig] = None):
+        self.config = config or MockConfig()
+        self.sessions: Dict[str, _Session] = {}
+        self.hits: Dict[str, int] = {}
+        self._rng = random.Random(self.config.seed)
+        self._routes = {
+            ("GET", "/vtop/open/page"): self.open_page,
+            ("GET", "/vtop/login"): self.open_page,
+            ("POST", "/vtop/prelogin/setup"): self.login_page,
+            ("POST", "/vtop/login"): self.login,
+            ("GET", "/vtop/content"): self.content,
+            ("POST", "/vtop/logout"): self.logout,
+        }
+        self._pages = {
+            "/vtop/studentsRecord/StudentProfileAllView": lambda f: fixtures.profile_page(),
+            "/vtop/academics/common/StudentTimeTable": lambda f: fixtures.semesters_page(),
+            "/vtop/processViewTimeTable": lambda f: timetable_page(),
+            "/vtop/examinations/doStudentMarkView": lambda f: fixtures.marks_page(),
+            "/vtop/examinations/doSearchExamScheduleForStudent": lambda f: fixtures.exam_schedule_page(),
+            "/vtop/processViewStudentAttendance": lambda f: fixtures.attendance_page(semester=f.get("semesterSubId", "")),
+            "/vtop/processViewAttendanceDetail": lambda f: fixtures.attendance_detail_page(
+                seed=sum(map(ord, f.get("courseId", "")))),
+            "/vtop/examinations/examGradeView/StudentGradeHistory": lambda f: fixtures.grade_history_page(),
+        }
+
+    async def handle(self, request: httpd.Request) -> httpd.Response:
+        self.hits[request.path] = self.hits.get(request.path, 0) + 1
+        await self._delay()
+
+        route = self._routes.get((request.method, request.path))
+        if route:
+            return route(request)
+        if request.method == "POST" and request.path in self._pages:
+            if self._rng.random() < self.config.error_rate:
+                return httpd.Response(503, "Service Temporarily Unavailable", "text/plain")
+            session = self._session(request)
+            if session is None or not session.reg_no:
+                return httpd.redirect("/vtop/login")
+            if not self._csrf_ok(session, request.form.get("_csrf", "")):
+                return httpd.Response(403, "Invalid CSRF Token", "text/plain")
+            page = self._pages[request.path](request.form)
+            return httpd.Response(200, page.replace(fixtures.REG_NO, session.reg_no))
+        return httpd.Response(404, "Not Found", "text/plain")
+
+    async def _delay(self):
+        c = self.config
+        delay = c.latency_ms + self._rng.uniform(-c.jitter_ms, c.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    # --- session bookkeeping ---
+    def _session(self, request):
+        session = self.sessions.get(request.cookies.get("JSESSIONID", ""))
+        if session is None:
+            return None
+        ttl = self.config.session_ttl
+        if ttl and time.time() - session.last_seen > ttl:
+            del self.sessions[request.cookies["JSESSIONID"]]
+            return None
+        session.last_seen = time.time()
+        return session
+
+    def _csrf_ok(self, session, token):
+        ttl = self.config.csrf_ttl
+        return token == session.csrf and not (ttl and time.time() - session.csrf_issued > ttl)
+
+    def _new_session(self, response):
+        sid = uuid.uuid4().hex.upper()
+        self.sessions[sid] = _Session()
+        response.set_cookie("JSESSIONID", sid, path="/vtop")
+        return self.sessions[sid]
+
+    # --- login flow ---
+    def open_page(self, request):
+        response = httpd.Response(200)
+        session = self._session(request) or self._new_session(response)
+        response.body = _login_html(session.csrf, captcha=False).encode()
+        return response
+
+    def login_page(self, request):
+        session = self._session(request)
+        if session is None:
+            return httpd.redirect("/vtop/open/page")
+        return httpd.Response(200, _login_html(session.csrf, captcha=True))
+
+    def login(self, request):
+        session = self._session(request)
+        form = request.form
+        if session is None or form.get("_csrf") != session.csrf or not form.get("username"):
+            return httpd.Response(200, _login_html(session.csrf if session else "", captcha=True, error="Invalid Captcha"))
+        session.reg_no = form["username"].strip().upper()
+        session.rotate_csrf()
+        return httpd.Response(200, _dashboard_html(session))
+
+    def content(self, request):
+        session = self._session(request)
+        if session is None or not session.reg_no:
+            return httpd.redirect("/vtop/login")
+        if self.config.csrf_ttl and time.time() - session.csrf_issued > self.config.csrf_ttl:
+            session.rotate_csrf()
+        return httpd.Response(200, _dashboard_html(session))
+
+    def logout(self, request):
+        self.sessions.pop(request.cookies.get("JSESSIONID", ""), None)
+        return httpd.redirect("/vtop/login")
+
+
+def _login_html(csrf, captcha, error=""):
+    captcha_block = (f'<img src="data:image/gif;base64,{CAPTCHA_GIF}" alt="captcha">'
+                     f'<input type="text" name="captchaStr" id="captchaStr">') if captcha else ""
+    return f"""<html><body><form id="vtopLoginForm" method="post" action="/vtop/login">
+<input type="hidden" name="_csrf" value="{csrf}">
+<input type="text" name="username" id="username"><input type="password" name="password" id="password">
+{captcha_block}<span class="error">{error}</span></form></body></html>"""
+
+
+def _dashboard_html(session):
+    return f"""<html><body>
+<form id="stdForm"><input type="hidden" name="_csrf" value="{session.csrf}">
+<input type="hidden" name="authorizedIDX" id="authorizedIDX" value="{session.reg_no}"></form>
+<span class="navbar-text">{session.reg_no}(STUDENT)</span><a href="/vtop/logout">Logout</a>
+</body></html>"""
+
+
+def timetable_page():
+    days = ["MON", "TUE", "WED", "THU", "FRI"]
+    rows = "".join(
+        f"<tr><td>{day}</td>" + "".join(
+            f"<td>{fixtures.PREFIXES[(d + p) % 8]}{1001 + (d + p) % 8}-ETH-AB1-{200 + p}-ALL</td>" for p in range(6)
+        ) + "</tr>"
+        for d, day in enumerate(days)
+    )
+    return f'<html><body><table id="timeTableStyle">{rows}</table></body></html>'
+
+
+async def run_mock(host="127.0.0.1", port=8585, config: Optional[MockConfig] = None):
+    """Starts the mock in the running loop; returns (server, MockVtop)."""
+    mock = MockVtop(config)
+    server = await httpd.serve(mock.handle, host, port)
+    return server, mock
+
+
+async def _main(args):
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.csrf_ttl, args.session_ttl, args.seed)
+    server, _ = await run_mock(args.host, args.port, config)
+    print(f"[+] Mock V-TOP listening on http://{args.host}:{args.port}  "
+          f"(latency {args.latency}±{args.jitter} ms, errors {args.error_rate:.0%}, csrf ttl {args.csrf_ttl or '∞'}s)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock V-TOP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8585)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean added latency in ms.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in ms.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of data requests answered with 503.")
+    parser.add_argument("--csrf-ttl", type=float, default=0.0, help="CSRF token lifetime in seconds (0 = never expires).")
+    parser.add_argument("--session-ttl", type=float, default=0.0, help="Idle session lifetime in seconds (0 = never).")
+    parser.add_argument("--seed", type=int, default=0)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("\n[!] Mock server stopped.")
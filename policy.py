@@ -0,0 +1,222 @@
+import asyncio
+import contextlib
+import contextvars
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+import metrics
+
+# ==========================================
+# ⏱️ REQUEST POLICY
+# ==========================================
+# Every V-TOP POST runs through call(): a per-attempt timeout, an overall
+# deadline, retries with exponential backoff and full jitter for transport
+# errors and 5xx answers (all data endpoints are reads, so replaying them is
+# safe) and, optionally, a hedged second request once an attempt has been
+# slower than that endpoint's recent p95. Whatever loses is cancelled, and so
+# is everything in flight when the caller itself gets cancelled.
+
+RETRY_STATUSES = (500, 502, 503, 504)
+# Most requests allowed at V-TOP at once when limit_upstream() is in effect
+UPSTREAM_CONCURRENCY = 4
+LATENCY_WINDOW = 200     # recent successful attempts kept per endpoint
+HEDGE_MIN_SAMPLES = 20   # no hedging until the p95 means something
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    deadline: float = 30.0          # seconds for the whole call, retries included
+    attempt_timeout: float = 15.0   # seconds for a single attempt
+    retries: int = 2                # extra attempts after the first
+    backoff: float = 0.5            # first retry waits up to this long...
+    max_backoff: float = 5.0        # ...doubling per retry, capped here
+    hedge: bool = False
+
+
+DEFAULT_POLICY = RequestPolicy()
+# The transcript and profile pages are big and slow on a good day
+ENDPOINT_POLICIES: Dict[str, RequestPolicy] = {
+    "grades": RequestPolicy(deadline=60.0, attempt_timeout=30.0),
+    "profile": RequestPolicy(deadline=45.0, attempt_timeout=20.0),
+}
+
+
+def configure(hedge: Optional[bool] = None, retries: Optional[int] = None, deadline: Optional[float] = None) -> None:
+    """Applies command-line overrides to the default and every per-endpoint policy."""
+    global DEFAULT_POLICY
+    if retries is not None:
+        retries = max(0, retries)  # call() needs at least one attempt
+    changes = {k: v for k, v in (("hedge", hedge), ("retries", retries), ("deadline", deadline)) if v is not None}
+    if not changes:
+        return
+    DEFAULT_POLICY = replace(DEFAULT_POLICY, **changes)
+    for name, policy in ENDPOINT_POLICIES.items():
+        ENDPOINT_POLICIES[name] = replace(policy, **changes)
+
+
+def policy_for(endpoint: str) -> RequestPolicy:
+    return ENDPOINT_POLICIES.get(endpoint, DEFAULT_POLICY)
+
+
+# A process-wide cap on requests in flight (serve mode: many local clients,
+# one portal). None means unlimited. Every way services.py talks to V-TOP
+# takes a slot: call() attempts, streamed downloads, the login sequence,
+# session probes and the library's own timetable request.
+_upstream: Optional[asyncio.Semaphore] = None
+_holding_slot = contextvars.ContextVar("holding_upstream_slot", default=False)
+
+
+def limit_upstream(limit: Optional[int]) -> None:
+    global _upstream
+    _upstream = asyncio.Semaphore(limit) if limit else None
+
+
+@contextlib.asynccontextmanager
+async def upstream_slot(across_yields: bool = False):
+    """
+    Holds one limit_upstream() slot around the enclosed request(s). Nested
+    use in the same task is free, so a sequence that already holds a slot
+    (a login) never waits on itself. An async generator that yields while
+    it holds the slot passes across_yields=True: the slot is then not marked
+    on the consumer's context, and its requests use call(..., slot=False).
+    """
+    if _upstream is None or _holding_slot.get():
+        yield
+        return
+    if _upstream.locked():
+        STATS["queued"] += 1
+    async with _upstream:
+        if across_yields:
+            yield
+            return
+        held = _holding_slot.set(True)
+        try:
+            yield
+        finally:
+            _holding_slot.reset(held)
+
+
+class LatencyTracker:
+    """Rolling window of successful attempt durations per endpoint."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self.samples: Dict[str, Deque[float]] = {}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, endpoint: str, q: float) -> Optional[float]:
+        samples = self.samples.get(endpoint)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+LATENCIES = LatencyTracker()
+STATS = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "queued": 0}
+metrics.counter_func("vtop_policy_events_total", "Request policy events: calls, retries, hedges, timeouts, queued.",
+                     lambda: STATS, "event")
+
+
+class RetryableStatus(Exception):
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+async def _attempt(endpoint: str, send: Callable[[], Awaitable[httpx.Response]], timeout: float,
+                   slot: bool = True) -> httpx.Response:
+    async with upstream_slot() if slot else contextlib.nullcontext():
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(send(), timeout)
+        except Exception as e:
+            metrics.REQUESTS.inc(endpoint=endpoint, status=type(e).__name__)
+            raise
+        elapsed = time.perf_counter() - started
+    metrics.REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+    # Zero for a streamed response: its reader counts the body as it arrives
+    metrics.RESPONSE_BYTES.inc(response.num_bytes_downloaded, endpoint=endpoint)
+    if response.status_code in RETRY_STATUSES:
+        raise RetryableStatus(response)
+    LATENCIES.record(endpoint, elapsed)
+    return response
+
+
+async def _hedged(endpoint: str, send: Callable[[], Awaitable[httpx.Response]], timeout: float,
+                  slot: bool = True) -> httpx.Response:
+    """One attempt, plus a second identical one if the first outlives the endpoint's p95."""
+    primary = asyncio.ensure_future(_attempt(endpoint, send, timeout, slot))
+    p95 = LATENCIES.quantile(endpoint, 0.95)
+    if p95 is None or p95 >= timeout:
+        return await primary
+
+    tasks = {primary}
+    started = [primary]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=p95)
+        if not done:
+            STATS["hedges"] += 1
+            backup = asyncio.ensure_future(_attempt(endpoint, send, timeout - p95, slot))
+            tasks.add(backup)
+            started.append(backup)
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # exception() raises on a cancelled task instead of returning
+                if not task.cancelled() and task.exception() is None:
+                    if task is not primary:
+                        STATS["hedge_wins"] += 1
+                    return task.result()
+        # Both failed: surface the primary's error (the backup's if the primary was cancelled)
+        return next((t for t in started if not t.cancelled()), primary).result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call(endpoint: str, send: Callable[[], Awaitable[httpx.Response]],
+               policy: Optional[RequestPolicy] = None, slot: bool = True) -> httpx.Response:
+    """
+    Runs send() (which must start a fresh request each time it is called)
+    under the endpoint's policy. Returns the response, or the last 5xx
+    response once retries are exhausted; raises the last transport error
+    or asyncio.TimeoutError otherwise. slot=False when the caller already
+    holds an upstream_slot(across_yields=True).
+    """
+    policy = policy or policy_for(endpoint)
+    STATS["calls"] += 1
+    give_up_at = time.monotonic() + policy.deadline
+    attempt_once = _hedged if policy.hedge else _attempt
+
+    for attempt in range(policy.retries + 1):
+        remaining = give_up_at - time.monotonic()
+        try:
+            return await attempt_once(endpoint, send, min(policy.attempt_timeout, remaining), slot)
+        except RetryableStatus as e:
+            failure = e
+        except asyncio.TimeoutError:
+            STATS["timeouts"] += 1
+            failure = asyncio.TimeoutError(f"{endpoint} did not answer in time (attempt {attempt + 1})")
+        except httpx.TransportError as e:
+            failure = e
+
+        delay = random.uniform(0, min(policy.max_backoff, policy.backoff * 2 ** attempt))
+        if attempt == policy.retries or time.monotonic() + delay >= give_up_at:
+            break
+        if isinstance(failure, RetryableStatus):
+            await failure.response.aclose()  # a streamed 5xx still holds its connection
+        STATS["retries"] += 1
+        await asyncio.sleep(delay)
+
+    if isinstance(failure, RetryableStatus):
+        return failure.response
+    raise failure
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpd
+import metrics
+import policy
+from services import (
+    SINGLE_FLIGHT,
+    fetchAttendance,
+    fetchAttendanceDetail,
+    fetchExamSchedule,
+    fetchGradeHistory,
+    fetchMarks,
+    fetchProfile,
+    fetchSemesters,
+    fetchTimetable,
+    log,
+)
+
+# ==========================================
+# 🖥️ SERVE MODE (LOCAL JSON API)
+# ==========================================
+# One logged-in VtopClient answers for every dashboard and script on the
+# machine. Results come from the response cache while fresh, identical
+# requests that overlap share one upstream fetch (single-flight), and
+# policy.limit_upstream() caps how many requests reach V-TOP at once.
+#
+#   GET /semesters   /profile   /grades
+#   GET /attendance  /marks  /exams  /timetable          [?semester=SEM_SUB_ID]
+#   GET /attendance/detail?course_id=ID&course_type=TYPE [&semester=SEM_SUB_ID]
+#   GET /health
+#   GET /metrics   (Prometheus text format)
+#
+# Data endpoints answer {"semester": ..., "data": ...}; ?fresh=1 skips the cache.
+
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8686
+
+GLOBAL_ENDPOINTS = {
+    "/semesters": fetchSemesters,
+    "/profile": fetchProfile,
+    "/grades": fetchGradeHistory,
+}
+SEMESTER_ENDPOINTS = {
+    "/attendance": fetchAttendance,
+    "/marks": fetchMarks,
+    "/exams": fetchExamSchedule,
+    "/timetable": fetchTimetable,
+}
+DETAIL_ENDPOINT = "/attendance/detail"
+
+API_REQUESTS = metrics.counter("vtop_api_requests_total", "Requests answered by serve mode, by path and status.")
+API_SECONDS = metrics.histogram("vtop_api_request_seconds", "Time to answer a serve mode request, by path.",
+                                metrics.NETWORK_BUCKETS)
+
+
+def _error(status: int, message: str) -> httpd.Response:
+    return httpd.json_response({"error": message}, status)
+
+
+class ApiServer:
+    def __init__(self, client, reg_no: str, keepalive=None):
+        self.client = client
+        self.reg_no = reg_no
+        self.keepalive = keepalive
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+
+    async def handle(self, request: httpd.Request) -> httpd.Response:
+        started = time.perf_counter()
+        self.requests += 1
+        if self.keepalive is not None:
+            self.keepalive.touch()
+        try:
+            response = await self._dispatch(request)
+        except asyncio.TimeoutError as e:
+            response = _error(504, str(e) or "V-TOP did not answer in time")
+        except Exception as e:
+            response = _error(502, f"V-TOP request failed: {e}")
+        elapsed = time.perf_counter() - started
+        if response.status >= 400:
+            self.errors += 1
+        # Unknown paths share one label so typos cannot grow the series without bound
+        path = (request.path.rstrip("/") or "/") if response.status != 404 else "other"
+        API_REQUESTS.inc(path=path, status=response.status)
+        API_SECONDS.observe(elapsed, path=path)
+        log(f"   {request.method} {request.target} -> {response.status} in {elapsed * 1000:.0f}ms")
+        return response
+
+    async def _dispatch(self, request: httpd.Request) -> httpd.Response:
+        path = request.path.rstrip("/") or "/"
+        if request.method != "GET":
+            return _error(405, "only GET is supported")
+        if path == "/health":
+            return httpd.json_response(self.health())
+        if path == "/metrics":
+            return httpd.Response(200, metrics.render(), metrics.CONTENT_TYPE)
+
+        fresh = request.query.get("fresh", "").lower() in ("1", "true", "yes")
+        if path in GLOBAL_ENDPOINTS:
+            return self._data(None, await GLOBAL_ENDPOINTS[path](self.client, fresh=fresh))
+
+        if path not in SEMESTER_ENDPOINTS and path != DETAIL_ENDPOINT:
+            endpoints = [*GLOBAL_ENDPOINTS, *SEMESTER_ENDPOINTS, DETAIL_ENDPOINT, "/health", "/metrics"]
+            return _error(404, f"unknown endpoint {path} (try {', '.join(endpoints)})")
+
+        semester = request.query.get("semester") or await self._latest_semester()
+        if path == DETAIL_ENDPOINT:
+            course_id, course_type = request.query.get("course_id"), request.query.get("course_type")
+            if not course_id or not course_type:
+                return _error(400, "course_id and course_type are required")
+            return self._data(semester, await fetchAttendanceDetail(self.client, semester, course_id,
+                                                                    course_type, fresh=fresh))
+        return self._data(semester, await SEMESTER_ENDPOINTS[path](self.client, semester, fresh=fresh))
+
+    async def _latest_semester(self) -> Optional[str]:
+        semesters = await fetchSemesters(self.client)
+        return semesters[0]["id"] if semesters else None
+
+    @staticmethod
+    def _data(semester: Optional[str], data: Any) -> httpd.Response:
+        return httpd.json_response({"semester": semester, "data": data})
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "reg_no": self.reg_no,
+            "uptime": round(time.monotonic() - self.started, 1),
+            "requests": self.requests,
+            "errors": self.errors,
+            "single_flight": dict(SINGLE_FLIGHT),
+            "upstream": dict(policy.STATS),
+        }
+
+
+async def run_serve(client, reg_no: str, host: str = SERVE_HOST, port: int = SERVE_PORT, keepalive=None) -> int:
+    api = ApiServer(client, reg_no, keepalive)
+    server = await httpd.serve(api.handle, host, port)
+    log(f"[+] Serving V-TOP data for {reg_no} on http://{host}:{port} (Ctrl+C to stop)")
+    async with server:
+        await server.serve_forever()
+    return 0
@@ -1,36 +1,27 @@
 from datetime import datetime
 import asyncio
+import contextvars
 import httpx
 import sys
 import time
 import re
-from typing import List, Dict, Any, Tuple
-from bs4 import BeautifulSoup
+import functools
+import contextlib
+import dataclasses
+import hashlib
+import concurrent.futures
+from typing import List, Dict, Any, Tuple, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
 from vitap_vtop_client.client import VtopClient
+from cache import ParseMemo, ResponseCache
+import session_store
+import policy
+import tracing
+import metrics
+from tracing import traced
+from attendance_store import AttendanceStore
 
-def get_cred(file_path="credentials.txt"):
-    """
-    Reads username from line 1 and password from line 2.
-    """
-    try:
-        with open(file_path, "r") as f:
-            lines = f.readlines()
-            
-            if len(lines) < 2:
-                print("[!] Error: credentials.txt must have at least 2 lines (User and Pass).")
-                sys.exit(1)
-
-            # line 1 is index 0, line 2 is index 1
-            username = lines[0].strip()
-            password = lines[1].strip()
-            
-            return username, password
-            
-    except FileNotFoundError:
-        print(f"[!] Error: {file_path} not found.")
-        sys.exit(1)
-
-a, password = get_cred("credentials.txt")
 # ==========================================
 # 🛠️ SSL BYPASS
 # ==========================================
@@ -40,6 +31,290 @@ def _patched_init(self, *args, **kwargs):
     _original_init(self, *args, **kwargs)
 httpx.AsyncClient.__init__ = _patched_init
 
+# ==========================================
+# 🔀 BASE URL OVERRIDE
+# ==========================================
+# Every V-TOP URL (ours and the ones VtopClient builds internally) points at
+# vtop.vitap.ac.in. To run the same code path against a local stand-in
+# (mock_server.py), the client's transport rewrites that host to another
+# base URL. Cookies keep being stored for vtop.vitap.ac.in, since httpx
+# files them under the original request.
+VTOP_HOST = "vtop.vitap.ac.in"
+
+class _RebaseTransport(httpx.AsyncBaseTransport):
+    def __init__(self, base_url: str, inner: httpx.AsyncBaseTransport):
+        self.base = httpx.URL(base_url)
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == VTOP_HOST:
+            url = request.url.copy_with(scheme=self.base.scheme, host=self.base.host, port=self.base.port)
+            headers = request.headers.copy()
+            headers["Host"] = url.netloc.decode("ascii")
+            request = httpx.Request(request.method, url, headers=headers,
+                                    stream=request.stream, extensions=request.extensions)
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+def point_client_at(client: VtopClient, base_url: str) -> None:
+    """Sends all of this client's V-TOP traffic to `base_url` instead."""
+    client._client._transport = _RebaseTransport(base_url, httpx.AsyncHTTPTransport(verify=False))
+
+@contextlib.asynccontextmanager
+async def openClient(reg_no: str, password: str, base_url: Optional[str] = None):
+    """`async with openClient(...) as client`: a VtopClient bound to one account."""
+    async with VtopClient(reg_no, password) as client:
+        client.reg_no = reg_no
+        if base_url:
+            point_client_at(client, base_url)
+        tracing.instrument(client)
+        yield client
+
+# ==========================================
+# 📝 PROGRESS LOGGING
+# ==========================================
+# Fetchers report progress through log() instead of print() so that work
+# running in the background (e.g. the semester prefetch) can be silenced per
+# task without muting the foreground. The flag lives in a ContextVar, which
+# every asyncio task copies when it is created.
+_log_enabled = contextvars.ContextVar("vtop_log_enabled", default=True)
+# None means stdout; scripted (JSON) runs move progress output to stderr.
+LOG_STREAM = None
+
+def log(message: str) -> None:
+    if _log_enabled.get():
+        print(message, file=LOG_STREAM)
+
+def set_log_stream(stream) -> None:
+    global LOG_STREAM
+    LOG_STREAM = stream
+
+def silence_logs() -> None:
+    """Suppress fetcher output for the current task (and tasks it spawns)."""
+    _log_enabled.set(False)
+
+# ==========================================
+# 🧩 HTML PARSER BACKEND
+# ==========================================
+# "html.parser" : stdlib parser over the whole page (original behaviour)
+# "lxml"        : same tree, built by lxml's C parser
+# "lxml-strainer": lxml, but only the tags a parser actually reads are kept
+#                  (SoupStrainer), which skips most of the page's markup
+PARSER_BACKENDS = ("html.parser", "lxml", "lxml-strainer")
+PARSER_BACKEND = "html.parser"
+
+TABLE_STRAINER = SoupStrainer("table")
+PROFILE_STRAINER = SoupStrainer(["label", "p", "table"])
+ATTENDANCE_STRAINER = SoupStrainer("table", id="AttendanceDetailDataTable")
+ATTENDANCE_DETAIL_STRAINER = SoupStrainer("table", id="StudentAttendanceDetailDataTable")
+
+def set_parser_backend(name: str) -> None:
+    global PARSER_BACKEND
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}' (choose from {', '.join(PARSER_BACKENDS)})")
+    PARSER_BACKEND = name
+
+def make_soup(html: str, strainer: Optional[SoupStrainer] = None, backend: Optional[str] = None) -> BeautifulSoup:
+    """Builds the soup every parse* function works on, using the configured backend."""
+    backend = backend or PARSER_BACKEND
+    if backend == "lxml-strainer" and strainer is not None:
+        return BeautifulSoup(html, "lxml", parse_only=strainer)
+    return BeautifulSoup(html, "html.parser" if backend == "html.parser" else "lxml")
+
+# ==========================================
+# 🧵 PARSER OFFLOAD
+# ==========================================
+# Building a soup is pure CPU. Inline (the default) it blocks the event
+# loop, so with several fetches in flight the parses queue up and stall
+# everyone's network I/O. configure_parse_pool() moves parse* calls to a
+# thread pool or a process pool instead. Only the HTML goes over and the
+# parsed rows come back, and the backend name is passed explicitly because
+# pool processes do not see set_parser_backend().
+PARSE_POOLS = ("inline", "thread", "process")
+_parse_pool: Optional[concurrent.futures.Executor] = None
+
+def configure_parse_pool(kind: str = "inline", workers: Optional[int] = None) -> None:
+    global _parse_pool
+    if kind not in PARSE_POOLS:
+        raise ValueError(f"Unknown parse pool '{kind}' (choose from {', '.join(PARSE_POOLS)})")
+    shutdown_parse_pool()
+    if kind == "thread":
+        _parse_pool = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="vtop-parse")
+    elif kind == "process":
+        _parse_pool = concurrent.futures.ProcessPoolExecutor(workers)
+
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+# Identical pages are parsed once: see cache.ParseMemo. None disables it.
+_parse_memo: Optional[ParseMemo] = ParseMemo()
+
+def configure_parse_memo(memo: Optional[ParseMemo]) -> None:
+    global _parse_memo
+    _parse_memo = memo
+
+def parse_memo_stats() -> Dict[str, int]:
+    memo = _parse_memo
+    if memo is None:
+        return {"hits": 0, "disk_hits": 0, "misses": 0}
+    return {"hits": memo.hits, "disk_hits": memo.disk_hits, "misses": memo.misses}
+
+def _memo_key(parse, html: str, backend: str) -> str:
+    # The CSRF token embedded in every page changes per session; leave it out
+    # so an otherwise identical page still matches.
+    body = CSRF_PATTERN.sub("", html)
+    return f"{parse.__name__}:{backend}:{hashlib.sha256(body.encode('utf-8', 'replace')).hexdigest()}"
+
+async def run_parser(parse, html: str):
+    """parse(html, backend) inline or on the configured pool, memoized by page content."""
+    backend = PARSER_BACKEND
+    memo = _parse_memo
+    with tracing.span(parse.__name__, "parse", bytes=len(html)) as span:
+        key = _memo_key(parse, html, backend) if memo is not None else None
+        if key is not None:
+            hit = memo.get(key)
+            if hit is not None:
+                span.set(memo="hit")
+                metrics.PARSE_MEMO.inc(result="hit")
+                return hit
+            metrics.PARSE_MEMO.inc(result="miss")
+
+        started = time.perf_counter()
+        if _parse_pool is None:
+            result = parse(html, backend)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(_parse_pool, parse, html, backend)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - started, parser=parse.__name__)
+        if key is not None:
+            memo.put(key, result)
+        return result
+
+# ==========================================
+# 💾 RESPONSE CACHE HOOK
+# ==========================================
+# Disabled until main() installs a ResponseCache via configure_cache().
+_response_cache: Optional[ResponseCache] = None
+_revalidations: Dict[tuple, asyncio.Task] = {}
+
+def configure_cache(cache: Optional[ResponseCache]) -> None:
+    global _response_cache
+    _response_cache = cache
+
+def _reg_no(client: VtopClient) -> str:
+    # Always per client (never a module-level default), so many accounts can
+    # share one process without leaking into each other's requests.
+    return getattr(client, "username", None) or getattr(client, "reg_no", "")
+
+def cached(endpoint: str, keep=bool):
+    """
+    Serves a fetcher from the on-disk cache while its entry is fresh.
+    The first positional argument after the client is the semesterSubId; any
+    further ones become part of the key. Only results for which keep(result)
+    is true are stored, so error fallbacks never get cached. Pass fresh=True
+    to skip the lookup and force a network fetch. Identical calls that overlap
+    share one fetch (see _single_flight), with or without a cache.
+    """
+    def decorator(fetcher):
+        @functools.wraps(fetcher)
+        async def wrapper(client: VtopClient, *args, fresh: bool = False):
+            with tracing.span(fetcher.__name__, "fetch") as span:
+                return await lookup(span, client, *args, fresh=fresh)
+
+        async def lookup(span, client: VtopClient, *args, fresh: bool = False):
+            cache = _response_cache
+            reg_no = _reg_no(client)
+            semester = args[0] if args else ""
+            extra = args[1:]
+            key = (endpoint, reg_no, semester, extra)
+
+            async def fetch():
+                value = await fetcher(client, *args)
+                if cache is not None and keep(value):
+                    cache.put(endpoint, reg_no, semester, extra, value)
+                return value
+
+            def refresh():
+                return _single_flight(key, fetch)
+
+            if cache is not None and not fresh:
+                hit = cache.get(endpoint, reg_no, semester, extra)
+                if hit:
+                    value, is_fresh = hit
+                    if is_fresh:
+                        span.set(cache="hit")
+                        metrics.CACHE_LOOKUPS.inc(endpoint=endpoint, result="hit")
+                        return value
+                    if cache.stale_while_revalidate:
+                        span.set(cache="stale")
+                        metrics.CACHE_LOOKUPS.inc(endpoint=endpoint, result="stale")
+                        _revalidate(key, refresh)
+                        return value
+                metrics.CACHE_LOOKUPS.inc(endpoint=endpoint, result="miss")
+
+            return await refresh()
+        return wrapper
+    return decorator
+
+# ==========================================
+# 🛬 SINGLE-FLIGHT
+# ==========================================
+# A fetch that is already in flight is joined instead of repeated: the menu,
+# the prefetch, watch mode and fetchMany regularly ask for the same
+# (endpoint, account, semester) at the same moment. The fetch runs in its
+# own task, so one caller giving up does not cancel it for the others; it is
+# only cancelled when every caller waiting on it has gone.
+SINGLE_FLIGHT = {"fetches": 0, "joined": 0}
+metrics.counter_func("vtop_single_flight_total", "Fetches started vs. callers that joined one in flight.",
+                     lambda: SINGLE_FLIGHT, "kind")
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+_in_flight: Dict[tuple, _Flight] = {}
+
+async def _single_flight(key: tuple, fetch):
+    flight = _in_flight.get(key)
+    if flight is None:
+        flight = _Flight(asyncio.create_task(fetch()))
+        _in_flight[key] = flight
+        flight.task.add_done_callback(lambda _: _in_flight.pop(key, None) if _in_flight.get(key) is flight else None)
+        SINGLE_FLIGHT["fetches"] += 1
+    else:
+        SINGLE_FLIGHT["joined"] += 1
+
+    flight.waiters += 1
+    try:
+        return await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if flight.waiters == 1 and not flight.task.done():
+            flight.task.cancel()
+        raise
+    finally:
+        flight.waiters -= 1
+
+def _revalidate(key: tuple, refresh) -> None:
+    """Refreshes a stale entry in the background (one refresh per key at a time)."""
+    if key in _revalidations:
+        return
+
+    async def run():
+        silence_logs()
+        try:
+            await refresh()
+        except Exception:
+            pass
+        finally:
+            _revalidations.pop(key, None)
+
+    _revalidations[key] = asyncio.create_task(run())
+
 # ==========================================
 # 1. AUTHENTICATION & UTILS
 # ==========================================
@@ -54,490 +329,1110 @@ def get_credentials(filepath: str = "credentials.txt") -> Tuple[str, str]:
         print(f"[!] Error: '{filepath}' not found.")
         exit(1)
 
+@traced("login")
 async def vtopClientLogin(client: VtopClient) -> bool:
     try:
-        await client._perform_login_sequence()
+        async with policy.upstream_slot():
+            await client._perform_login_sequence()
+        metrics.LOGINS.inc(kind="password", result="ok")
         return True
     except Exception as e:
-        print(f"Login Failed: {e}")
+        log(f"Login Failed: {e}")
+        metrics.LOGINS.inc(kind="password", result="failed")
+        return False
+
+def _redirected_to_login(response: httpx.Response) -> bool:
+    """The status/URL half of _looks_logged_out(), usable before the body is read."""
+    if response.status_code in (401, 403) or 300 <= response.status_code < 400:
+        return True
+    return "login" in response.url.path.lower()
+
+LOGIN_MARKERS = ('name="captchaStr"', 'id="vtopLoginForm"')
+
+def _is_login_page(text: str) -> bool:
+    return any(marker in text for marker in LOGIN_MARKERS)
+
+def _looks_logged_out(response: httpx.Response) -> bool:
+    """True when V-TOP answered with (or redirected to) its login page."""
+    return _redirected_to_login(response) or _is_login_page(response.text)
+
+@traced("session")
+async def probeSession(client: VtopClient) -> bool:
+    """
+    Cheap validity check for a restored session: one dashboard GET, which also
+    yields a fresh CSRF token when the session is still alive.
+    """
+    try:
+        async with policy.upstream_slot():
+            dash_res = await client._client.get("vtop/content")
+    except Exception:
+        return False
+    if _looks_logged_out(dash_res):
+        return False
+    csrf_match = CSRF_PATTERN.search(dash_res.text)
+    if not csrf_match:
+        return False
+    client.csrf_token = csrf_match.group(1)
+    return True
+
+@traced("login")
+async def vtopSessionLogin(client: VtopClient, password: str, persist: bool = True) -> bool:
+    """
+    Reuses the session saved by a previous launch when it is still valid and
+    only falls back to the full vtopClientLogin() when it has expired.
+    """
+    reg_no = _reg_no(client)
+    if persist and session_store.load_session(client, reg_no, password):
+        if await probeSession(client):
+            log("   [+] Resumed saved session.")
+            metrics.LOGINS.inc(kind="session", result="ok")
+            return True
+        log("   ...Saved session expired, logging in again...")
+        metrics.LOGINS.inc(kind="session", result="expired")
+        client._client.cookies.clear()
+        session_store.clear_session(reg_no)
+
+    if not await vtopClientLogin(client):
         return False
+
+    if persist:
+        if not session_store.is_available():
+            log("   [!] Install 'cryptography' to keep the session between launches.")
+            return True
+        try:
+            await refreshCsrfToken(client)
+            session_store.save_session(client, reg_no, password)
+        except Exception as e:
+            log(f"   [!] Could not save session: {e}")
+    return True
+# ==========================================
+# 🔑 CSRF TOKEN MANAGER
+# ==========================================
+# One per client. Fetchers post through _post() (streams through
+# _stream_rows()), which puts the current token in the form and checks the
+# answer: a login page, a 401/403 or the
+# "invalid CSRF token" error means the token (or the whole session) went
+# stale, so the token is refreshed once - logging in again if the dashboard
+# is gone too - and the request is replayed. An answer without a data table
+# is not stale: courses without classes legitimately have none. Callers that
+# notice the expiry at the same time wait on the same refresh instead of
+# each doing their own.
+CSRF_PATTERN = re.compile(r'name="_csrf"\s+value="([a-f0-9-]+)"')
+CSRF_REJECTED = re.compile(r"invalid csrf token", re.IGNORECASE)
+
+def _stale_page(text: str) -> bool:
+    return _is_login_page(text) or bool(CSRF_REJECTED.search(text))
+
+def _token_rejected(response: httpx.Response) -> bool:
+    return _redirected_to_login(response) or _stale_page(response.text)
+
+class TokenManager:
+    def __init__(self, client: VtopClient):
+        self.client = client
+        self.generation = 0     # bumped on every completed refresh
+        self.refreshes = 0
+        self.relogins = 0
+        self.last_used = time.monotonic()   # last request sent with the token
+        self._lock = asyncio.Lock()
+
+    @property
+    def token(self) -> str:
+        # Stored on the client, where login/probe/session restore put it too
+        return getattr(self.client, "csrf_token", "")
+
+    async def get(self) -> str:
+        if not self.token:
+            await self.refresh()
+        return self.token
+
+    async def refresh(self, seen: Optional[int] = None, relogin: bool = True) -> str:
+        """
+        Scrapes a new token from the dashboard. `seen` is the generation the
+        caller's failed request used; if a refresh finished since then, its
+        token is returned without another round trip.
+        """
+        seen = self.generation if seen is None else seen
+        async with self._lock:
+            if self.generation != seen:
+                return self.token
+            with tracing.span("csrf refresh", "session"):
+                return await self._refresh(relogin)
+
+    async def _refresh(self, relogin: bool) -> str:
+        # probeSession() only stores a token scraped from a live dashboard,
+        # never one from the login page a dead session redirects to
+        alive = await probeSession(self.client)
+        if not alive and relogin:
+            log("   ...Session expired, logging in again...")
+            self.relogins += 1
+            metrics.CSRF_REFRESHES.inc(relogin="yes")
+            alive = await vtopClientLogin(self.client) and await probeSession(self.client)
+        else:
+            metrics.CSRF_REFRESHES.inc(relogin="no")
+        if not alive:
+            log("   [!] Could not renew the V-TOP session.")
+        self.refreshes += 1
+        self.generation += 1
+        return self.token
+
+def tokens(client: VtopClient) -> TokenManager:
+    manager = getattr(client, "_token_manager", None)
+    if manager is None:
+        manager = client._token_manager = TokenManager(client)
+    return manager
+
+def _with_token(data, files, token):
+    if files is not None:
+        return data, dict(files, _csrf=(None, token))
+    return dict(data or {}, _csrf=token), files
+
+class _TokenRetry:
+    """
+    The refresh-and-replay loop of _post() and _stream_rows(): form() adds
+    the current token to each attempt's form; after a stale answer, replay()
+    refreshes the token and says whether to send the request once more.
+    """
+    def __init__(self, client: VtopClient):
+        self.manager = tokens(client)
+        self.attempt = 0
+        self.generation = 0
+
+    async def form(self, data, files):
+        await self.manager.get()
+        self.attempt += 1
+        self.generation = self.manager.generation
+        self.manager.last_used = time.monotonic()
+        return _with_token(data, files, self.manager.token)
+
+    async def replay(self) -> bool:
+        if self.attempt >= 2:
+            return False
+        await self.manager.refresh(self.generation)
+        return True
+
+async def _post(client: VtopClient, endpoint: str, url: str, data: Optional[Dict[str, Any]] = None,
+                files: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """
+    POSTs a V-TOP form with the current CSRF token added (as a multipart
+    field when `files` is given), under `endpoint`'s request policy
+    (policy.py).
+    """
+    retry = _TokenRetry(client)
+    while True:
+        body, parts = await retry.form(data, files)
+        response = await policy.call(
+            endpoint, lambda: client._client.post(url, data=body, files=parts, headers=headers))
+        if not _token_rejected(response) or not await retry.replay():
+            return response
+
+# ==========================================
+# 💓 SESSION KEEP-ALIVE
+# ==========================================
+# Optional heartbeat for a dashboard left open: every `interval` seconds
+# without other traffic it sends the cheapest authenticated request (the
+# dashboard probe), so the server-side session never idles out. If the
+# session died anyway it is renewed in the background, before the next menu
+# action needs it. Once the user has been inactive for `idle_timeout` the
+# heartbeat stops; the next touch() starts it again.
+class SessionKeepAlive:
+    def __init__(self, client: VtopClient, interval: float, idle_timeout: float):
+        self.client = client
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.last_activity = time.monotonic()
+        self.beats = 0
+        self.renewals = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "SessionKeepAlive":
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    def touch(self) -> None:
+        """Records user activity (and restarts a heartbeat stopped for idleness)."""
+        self.last_activity = time.monotonic()
+        self.start()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        silence_logs()
+        manager = tokens(self.client)
+        while True:
+            now = time.monotonic()
+            if now - self.last_activity > self.idle_timeout:
+                return
+            # Real requests count as heartbeats too
+            wait = self.interval - (now - manager.last_used)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            manager.last_used = time.monotonic()
+            self.beats += 1
+            if not await probeSession(self.client):
+                self.renewals += 1
+                try:
+                    await manager.refresh()
+                except Exception:
+                    pass  # the next request's own expiry handling gets another go
+
 # ==========================================
 # --- NEW: FETCH PROFILE & PROCTOR INFO ---
+# A failed request still parses into the all-"-" skeleton; only real profiles are cached
+@cached("profile", keep=lambda p: p.get("basic", {}).get("regno") not in (None, "-"))
 async def fetchProfile(client: VtopClient) -> Dict[str, Any]:
     url = "https://vtop.vitap.ac.in/vtop/studentsRecord/StudentProfileAllView"
     
     try:
-        token = getattr(client, "csrf_token", "")
-        reg_no = getattr(client, "username", getattr(client, "reg_no", a))
+        reg_no = _reg_no(client)
 
         payload = {
             "verifyMenu": "true",
             "authorizedID": reg_no,
-            "_csrf": token,
             "nocache": "@(new Date().getTime())"
         }
 
-        response = await client._client.post(url, data=payload, headers={
+        response = await _post(client, "profile", url, data=payload, headers={
             "X-Requested-With": "XMLHttpRequest",
             "Referer": "https://vtop.vitap.ac.in/vtop/content"
         })
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        data = {
-            "basic": {"name": "-", "regno": "-", "vitemail": "-", "mobile": "-", "program": "-", "school": "-"},
-            "proctor": {}
-        }
-        
-        # --- 1. Top Card Labels (Name, RegNo, Email, Program) ---
-        labels = soup.find_all('label')
-        for i, label in enumerate(labels):
-            key = label.get_text(strip=True).upper()
-            if i + 1 < len(labels):
-                val = labels[i+1].get_text(strip=True)
-                if "REGISTER NUMBER" in key: data["basic"]["regno"] = val
-                elif "VIT EMAIL" in key and "@vitapstudent.ac.in" in val: data["basic"]["vitemail"] = val
-                elif "PROGRAM" in key: data["basic"]["program"] = val
-                elif "SCHOOL NAME" in key: data["basic"]["school"] = val
-
-        # --- 2. Name Extraction ---
-        name_p = soup.find('p', style=lambda s: s and "font-weight: bold" in s and "text-align: center" in s)
-        if name_p: data["basic"]["name"] = name_p.get_text(strip=True)
-
-        # --- 3. Accordion Table Processing (Mobile & Proctor) ---
-        tables = soup.find_all('table')
-        for table in tables:
-            full_text = table.get_text().lower()
-            rows = table.find_all('tr')
-
-            # FINGERPRINT: Proctor Table
-            if "faculty id" in full_text:
-                for row in rows:
-                    cols = row.find_all('td')
-                    if len(cols) < 2: continue
-                    k, v = cols[0].get_text(strip=True).lower(), cols[1].get_text(strip=True)
-                    if "faculty id" in k: data["proctor"]["Faculty ID"] = v
-                    elif "name" in k: data["proctor"]["Name"] = v
-                    elif "email" in k: data["proctor"]["Email"] = v
-                    elif "mobile" in k: data["proctor"]["Mobile"] = v
-                    elif "cabin" in k: data["proctor"]["Cabin"] = v
-
-            # FINGERPRINT: Personal Info Table
-            elif "native state" in full_text or "blood group" in full_text:
-                for row in rows:
-                    cols = row.find_all('td')
-                    if len(cols) < 2: continue
-                    k, v = cols[0].get_text(strip=True).lower(), cols[1].get_text(strip=True)
-                    if "mobile" in k: data["basic"]["mobile"] = v
-
-        return data
+        return await run_parser(parseProfile, response.text)
     except Exception as e:
-        print(f"   [!] Profile fetch error: {e}")
+        log(f"   [!] Profile fetch error: {e}")
         return {}
 
+def parseProfile(html: str, backend: Optional[str] = None) -> Dict[str, Any]:
+    """Student profile card, personal info and proctor tables."""
+    soup = make_soup(html, PROFILE_STRAINER, backend)
+    
+    data = {
+        "basic": {"name": "-", "regno": "-", "vitemail": "-", "mobile": "-", "program": "-", "school": "-"},
+        "proctor": {}
+    }
+    
+    # --- 1. Top Card Labels (Name, RegNo, Email, Program) ---
+    labels = soup.find_all('label')
+    for i, label in enumerate(labels):
+        key = label.get_text(strip=True).upper()
+        if i + 1 < len(labels):
+            val = labels[i+1].get_text(strip=True)
+            if "REGISTER NUMBER" in key: data["basic"]["regno"] = val
+            elif "VIT EMAIL" in key and "@vitapstudent.ac.in" in val: data["basic"]["vitemail"] = val
+            elif "PROGRAM" in key: data["basic"]["program"] = val
+            elif "SCHOOL NAME" in key: data["basic"]["school"] = val
+
+    # --- 2. Name Extraction ---
+    name_p = soup.find('p', style=lambda s: s and "font-weight: bold" in s and "text-align: center" in s)
+    if name_p: data["basic"]["name"] = name_p.get_text(strip=True)
+
+    # --- 3. Accordion Table Processing (Mobile & Proctor) ---
+    tables = soup.find_all('table')
+    for table in tables:
+        full_text = table.get_text().lower()
+        rows = table.find_all('tr')
+
+        # FINGERPRINT: Proctor Table
+        if "faculty id" in full_text:
+            for row in rows:
+                cols = row.find_all('td')
+                if len(cols) < 2: continue
+                k, v = cols[0].get_text(strip=True).lower(), cols[1].get_text(strip=True)
+                if "faculty id" in k: data["proctor"]["Faculty ID"] = v
+                elif "name" in k: data["proctor"]["Name"] = v
+                elif "email" in k: data["proctor"]["Email"] = v
+                elif "mobile" in k: data["proctor"]["Mobile"] = v
+                elif "cabin" in k: data["proctor"]["Cabin"] = v
+
+        # FINGERPRINT: Personal Info Table
+        elif "native state" in full_text or "blood group" in full_text:
+            for row in rows:
+                cols = row.find_all('td')
+                if len(cols) < 2: continue
+                k, v = cols[0].get_text(strip=True).lower(), cols[1].get_text(strip=True)
+                if "mobile" in k: data["basic"]["mobile"] = v
+
+    return data
 
 # ==========================================
 # 2. ACADEMIC DATA METHODS
 # ==========================================
 
-async def fetchSemesters(client: VtopClient) -> List[Dict[str, str]]:
-    print("   ...Scraping semester list...")
+async def refreshCsrfToken(client: VtopClient) -> str:
+    """Re-scrapes the CSRF token from the dashboard and stores it on the client."""
+    return await tokens(client).refresh(relogin=False)
+
+async def fetchSemesters(client: VtopClient, fresh: bool = False) -> List[Dict[str, str]]:
+    log("   ...Scraping semester list...")
     try:
-        # 1. Get Token from Dashboard
-        dash_res = await client._client.get("vtop/content")
-        csrf_match = re.search(r'name="_csrf"\s+value="([a-f0-9-]+)"', dash_res.text)
-        token = csrf_match.group(1) if csrf_match else getattr(client, "csrf_token", "")
-        
-        # Store token for other functions to use
-        client.csrf_token = token 
+        # 1. Token from the dashboard, unless the login/session probe already left one
+        await tokens(client).get()
+    except Exception as e:
+        log(f"   [!] Semester scrape error: {e}")
+        return [{"name": "Fallback Semester", "id": "AP2025262"}] # Fallback
+
+    # 2. Semester options (served from cache when possible)
+    semesters = await fetchSemesterList(client, fresh=fresh)
+    return semesters or [{"name": "Fallback Semester", "id": "AP2025262"}] # Fallback
 
-        # 2. Request Timetable Page
+@cached("semesters")
+async def fetchSemesterList(client: VtopClient) -> List[Dict[str, str]]:
+    try:
+        # Request Timetable Page
         url = "https://vtop.vitap.ac.in/vtop/academics/common/StudentTimeTable"
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "X-Requested-With": "XMLHttpRequest",
             "Referer": "https://vtop.vitap.ac.in/vtop/content"
         }
-        reg_no = getattr(client, "username", getattr(client, "reg_no", a))
+        reg_no = _reg_no(client)
         payload = {
-            "verifyMenu": "true", "authorizedID": reg_no, "_csrf": token,
+            "verifyMenu": "true", "authorizedID": reg_no,
             "nocache": "@(new Date().getTime())"
         }
 
-        response = await client._client.post(url, data=payload, headers=headers)
-        
-        # 3. Parse Options
-        pattern = r'<option\s+value="([A-Z0-9]+)"[^>]*>([^<]+)</option>'
-        matches = re.findall(pattern, response.text)
-        
-        semesters = []
-        seen = set()
-        if matches:
-            for sid, sname in matches:
-                clean = " ".join(sname.split())
-                if sid and "Choose" not in clean and sid not in seen:
-                    semesters.append({"name": clean, "id": sid})
-                    seen.add(sid)
-            return semesters
+        response = await _post(client, "semesters", url, data=payload, headers=headers)
+        return parseSemesters(response.text)
             
     except Exception as e:
-        print(f"   [!] Semester scrape error: {e}")
+        log(f"   [!] Semester scrape error: {e}")
+        return []
 
-    return [{"name": "Fallback Semester", "id": "AP2025262"}] # Fallback
+def parseSemesters(html: str) -> List[Dict[str, str]]:
+    """Semester <option>s of the timetable page (plain regex, no soup needed)."""
+    pattern = r'<option\s+value="([A-Z0-9]+)"[^>]*>([^<]+)</option>'
+    matches = re.findall(pattern, html)
+    
+    semesters = []
+    seen = set()
+    for sid, sname in matches:
+        clean = " ".join(sname.split())
+        if sid and "Choose" not in clean and sid not in seen:
+            semesters.append({"name": clean, "id": sid})
+            seen.add(sid)
+    return semesters
 
+def _marks_request(client: VtopClient, semesterId: str) -> Dict[str, Any]:
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": "https://vtop.vitap.ac.in/vtop/content"
+    }
+    multipart_data = {
+        "authorizedID": (None, _reg_no(client)),
+        "semesterSubId": (None, semesterId)
+    }
+    return {"url": "https://vtop.vitap.ac.in/vtop/examinations/doStudentMarkView",
+            "files": multipart_data, "headers": headers}
+
+@cached("marks")
 async def fetchMarks(client: VtopClient, semesterId: str) -> Dict[str, Any]:
-    print(f"   ...Fetching Internal Marks for {semesterId}...")
-    
-    url = "https://vtop.vitap.ac.in/vtop/examinations/doStudentMarkView"
+    log(f"   ...Fetching Internal Marks for {semesterId}...")
     
     try:
-        token = getattr(client, "csrf_token", "")
-        reg_no = getattr(client, "username", getattr(client, "reg_no", a))
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
-            "X-Requested-With": "XMLHttpRequest",
-            "Referer": "https://vtop.vitap.ac.in/vtop/content"
-        }
-        
-        multipart_data = {
-            "authorizedID": (None, reg_no),
-            "semesterSubId": (None, semesterId),
-            "_csrf": (None, token)
-        }
-
-        response = await client._client.post(url, files=multipart_data, headers=headers)
+        response = await _post(client, "marks", **_marks_request(client, semesterId))
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        courses_data = []
-        current_course = None
-        
-        rows = soup.find_all('tr')
-        
-        for row in rows:
-            cols = row.find_all('td')
-            if not cols: continue
-            
-            # Clean text
-            col1_text = cols[1].get_text(strip=True) if len(cols) > 1 else ""
-            
-            if re.match(r'^[A-Z]+\d{3,}', col1_text): 
-                if current_course: courses_data.append(current_course)
-                
-                title = cols[2].get_text(strip=True) if len(cols) > 2 else "Unknown"
-                current_course = {
-                    "course_code": col1_text,
-                    "course_title": title,
-                    "details": []
-                }
-                continue 
-            if current_course and len(cols) >= 6: # Ensure we have enough columns
-                mark_title = col1_text
-                
-                valid_types = ["CAT", "FAT", "Assignment", "Digital", "Quiz", "Lab", "Project", "Mid-Term"]
-                
-                if any(v in mark_title for v in valid_types) and "Total" not in mark_title:
-                    max_mark = cols[2].get_text(strip=True)
-                    
-                    # FIX: 'Status' (Present) is usually Col 4. 'Scored Mark' is usually Col 5.
-                    scored = cols[5].get_text(strip=True)
-                    
-                    # Fallback: If Col 5 is empty or text, try Col 4 just in case table shifts
-                    if not scored or scored == "-":
-                         scored = cols[4].get_text(strip=True)
-
-                    current_course["details"].append({
-                        "mark_title": mark_title,
-                        "max_mark": max_mark,
-                        "scored_mark": scored
-                    })
-
-        if current_course:
-            courses_data.append(current_course)
+        data = await run_parser(parseMarks, response.text)
 
-        if courses_data:
-            print(f"   [+] Parsed marks for {len(courses_data)} courses.")
-            return {"courses": courses_data}
+        if data:
+            log(f"   [+] Parsed marks for {len(data['courses'])} courses.")
+            return data
         else:
-            print("   [!] Parsed HTML but found no valid courses.")
+            log("   [!] Parsed HTML but found no valid courses.")
             with open("debug_marks.html", "w", encoding="utf-8") as f:
                 f.write(response.text)
 
     except Exception as e:
-        print(f"   [!] Marks fetch error: {e}")
+        log(f"   [!] Marks fetch error: {e}")
         
     return {}
     
-async def fetchExamSchedule(client: VtopClient, semesterId: str) -> List[Dict[str, Any]]:
-    print(f"   ...Fetching Exam Schedule for {semesterId}...")
+def parseMarks(html: str, backend: Optional[str] = None) -> Dict[str, Any]:
+    """Course header rows followed by their mark rows. Empty dict if none found."""
+    soup = make_soup(html, TABLE_STRAINER, backend)
+    courses_data = []
+    current_course = None
     
-    url = "https://vtop.vitap.ac.in/vtop/examinations/doSearchExamScheduleForStudent"
+    rows = soup.find_all('tr')
     
-    try:
-        token = getattr(client, "csrf_token", "")
-        reg_no = getattr(client, "username", getattr(client, "reg_no", a))
-
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
-            "X-Requested-With": "XMLHttpRequest",
-            "Referer": "https://vtop.vitap.ac.in/vtop/content"
-        }
-        
-        multipart_data = {
-            "authorizedID": (None, reg_no),
-            "semesterSubId": (None, semesterId),
-            "_csrf": (None, token)
-        }
-
-        response = await client._client.post(url, files=multipart_data, headers=headers)
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        rows = soup.find_all('tr')
+    for row in rows:
+        cols = row.find_all('td')
+        if not cols: continue
         
-        exams = []
-        current_exam_type = "Unknown" # Stores "FAT", "CAT1", etc.
+        # Clean text
+        col1_text = cols[1].get_text(strip=True) if len(cols) > 1 else ""
         
-        for row in rows:
-            # CHECK 1: Is this a Section Header? (e.g. <td class="panelHead-secondary">FAT</td>)
-            # The HTML you shared uses 'panelHead-secondary' for the Exam Type header
-            header_cell = row.find('td', class_='panelHead-secondary')
-            if header_cell:
-                current_exam_type = header_cell.get_text(strip=True)
-                continue # Skip to next row, we just updated the type
-
-            # CHECK 2: Is this a Data Row?
-            cols = row.find_all('td')
+        if re.match(r'^[A-Z]+\d{3,}', col1_text): 
+            if current_course: courses_data.append(current_course)
             
-            # HTML Structure based on your input:
-            # [0] S.No
-            # [1] Course Code
-            # [2] Course Title
-            # [3] Course Type
-            # [4] Class ID
-            # [5] Slot
-            # [6] Exam Date
-            # [7] Exam Session
-            # [8] Reporting Time
-            # [9] Exam Time
-            # [10] Venue
+            title = cols[2].get_text(strip=True) if len(cols) > 2 else "Unknown"
+            current_course = {
+                "course_code": col1_text,
+                "course_title": title,
+                "details": []
+            }
+            continue 
+        if current_course and len(cols) >= 6: # Ensure we have enough columns
+            mark_title = col1_text
             
-            if len(cols) >= 11:
-                code_text = cols[1].get_text(strip=True)
+            valid_types = ["CAT", "FAT", "Assignment", "Digital", "Quiz", "Lab", "Project", "Mid-Term"]
+            
+            if any(v in mark_title for v in valid_types) and "Total" not in mark_title:
+                max_mark = cols[2].get_text(strip=True)
                 
-                # Verify it is a course code (e.g., CSE2001)
-                if re.match(r'^[A-Z]+\d{3,}', code_text):
-                    exams.append({
-                        'course_code': code_text,
-                        'course_title': cols[2].get_text(strip=True),
-                        'class_id': cols[4].get_text(strip=True),     # Capture Class ID
-                        'exam_type': current_exam_type,               # Use the Section Header we found earlier
-                        'exam_date': cols[6].get_text(strip=True),
-                        'exam_time': cols[9].get_text(strip=True),
-                        'venue': cols[10].get_text(strip=True)
-                    })
+                # FIX: 'Status' (Present) is usually Col 4. 'Scored Mark' is usually Col 5.
+                scored = cols[5].get_text(strip=True)
+                
+                # Fallback: If Col 5 is empty or text, try Col 4 just in case table shifts
+                if not scored or scored == "-":
+                     scored = cols[4].get_text(strip=True)
+
+                current_course["details"].append({
+                    "mark_title": mark_title,
+                    "max_mark": max_mark,
+                    "scored_mark": scored
+                })
+
+    if current_course:
+        courses_data.append(current_course)
+
+    return {"courses": courses_data} if courses_data else {}
+
+def _exams_request(client: VtopClient, semesterId: str) -> Dict[str, Any]:
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": "https://vtop.vitap.ac.in/vtop/content"
+    }
+    multipart_data = {
+        "authorizedID": (None, _reg_no(client)),
+        "semesterSubId": (None, semesterId)
+    }
+    return {"url": "https://vtop.vitap.ac.in/vtop/examinations/doSearchExamScheduleForStudent",
+            "files": multipart_data, "headers": headers}
+
+@cached("exams")
+async def fetchExamSchedule(client: VtopClient, semesterId: str) -> List[Dict[str, Any]]:
+    log(f"   ...Fetching Exam Schedule for {semesterId}...")
+    
+    try:
+        response = await _post(client, "exams", **_exams_request(client, semesterId))
+        
+        exams = await run_parser(parseExamSchedule, response.text)
         
         if exams:
-            print(f"   [+] Found {len(exams)} upcoming exams.")
+            log(f"   [+] Found {len(exams)} upcoming exams.")
             return exams
         else:
-            print("   [!] Parsed page but found no exams.")
+            log("   [!] Parsed page but found no exams.")
             with open("debug_exams.html", "w", encoding="utf-8") as f: f.write(response.text)
                 
     except Exception as e:
-        print(f"   [!] Exam fetch error: {e}")
+        log(f"   [!] Exam fetch error: {e}")
     return []
     
+def parseExamSchedule(html: str, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Exam rows, each tagged with the section header (FAT, CAT1, ...) above it."""
+    soup = make_soup(html, TABLE_STRAINER, backend)
+    rows = soup.find_all('tr')
+    
+    exams = []
+    current_exam_type = "Unknown" # Stores "FAT", "CAT1", etc.
+    
+    for row in rows:
+        # CHECK 1: Is this a Section Header? (e.g. <td class="panelHead-secondary">FAT</td>)
+        # The HTML you shared uses 'panelHead-secondary' for the Exam Type header
+        header_cell = row.find('td', class_='panelHead-secondary')
+        if header_cell:
+            current_exam_type = header_cell.get_text(strip=True)
+            continue # Skip to next row, we just updated the type
+
+        # CHECK 2: Is this a Data Row?
+        cols = row.find_all('td')
+        
+        # HTML Structure based on your input:
+        # [0] S.No
+        # [1] Course Code
+        # [2] Course Title
+        # [3] Course Type
+        # [4] Class ID
+        # [5] Slot
+        # [6] Exam Date
+        # [7] Exam Session
+        # [8] Reporting Time
+        # [9] Exam Time
+        # [10] Venue
+        
+        if len(cols) >= 11:
+            code_text = cols[1].get_text(strip=True)
+            
+            # Verify it is a course code (e.g., CSE2001)
+            if re.match(r'^[A-Z]+\d{3,}', code_text):
+                exams.append({
+                    'course_code': code_text,
+                    'course_title': cols[2].get_text(strip=True),
+                    'class_id': cols[4].get_text(strip=True),     # Capture Class ID
+                    'exam_type': current_exam_type,               # Use the Section Header we found earlier
+                    'exam_date': cols[6].get_text(strip=True),
+                    'exam_time': cols[9].get_text(strip=True),
+                    'venue': cols[10].get_text(strip=True)
+                })
+
+    return exams
+
 # --- KEEP TIMETABLE & ATTENDANCE AS IS (Or update similarly if they break) ---
 # --- UPDATED: ATTENDANCE SYSTEM (SUMMARY + DETAILS) ---
 
+def _attendance_request(client: VtopClient, semesterId: str) -> Dict[str, Any]:
+    # This was the missing part causing your error:
+    payload = {
+        "semesterSubId": semesterId,
+        "authorizedID": _reg_no(client),
+        "nocache": "@(new Date().getTime())"
+    }
+    headers = {
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": "https://vtop.vitap.ac.in/vtop/content"
+    }
+    return {"url": "https://vtop.vitap.ac.in/vtop/processViewStudentAttendance",
+            "data": payload, "headers": headers}
+
+@cached("attendance")
 async def fetchAttendance(client: VtopClient, semesterId: str) -> List[Dict[str, Any]]:
-    url = "https://vtop.vitap.ac.in/vtop/processViewStudentAttendance"
     try:
-        token = getattr(client, "csrf_token", "")
-        reg_no = getattr(client, "username", a)
-
-        # This was the missing part causing your error:
-        payload = {
-            "semesterSubId": semesterId,
-            "authorizedID": reg_no,
-            "_csrf": token,
-            "nocache": "@(new Date().getTime())"
-        }
+        response = await _post(client, "attendance", **_attendance_request(client, semesterId))
+        return await run_parser(parseAttendance, response.text)
+    except Exception as e:
+        log(f"   [!] fetchAttendance Error: {e}")
+        return []
 
-        headers = {
-            "X-Requested-With": "XMLHttpRequest",
-            "Referer": "https://vtop.vitap.ac.in/vtop/content"
-        }
+def parseAttendance(html: str, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Attendance summary rows, including the ids needed for the drill-down."""
+    soup = make_soup(html, ATTENDANCE_STRAINER, backend)
+    
+    # Locate the attendance table
+    table = soup.find('table', {'id': 'AttendanceDetailDataTable'})
+    if not table:
+        return []
 
-        response = await client._client.post(url, data=payload, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
+    attendance_data = []
+    rows = table.find_all('tr')[1:] # Skip header
+    
+    for row in rows:
+        cols = row.find_all('td')
+        if len(cols) < 8: continue
         
-        # Locate the attendance table
-        table = soup.find('table', {'id': 'AttendanceDetailDataTable'})
-        if not table:
-            return []
-
-        attendance_data = []
-        rows = table.find_all('tr')[1:] # Skip header
+        # Extract basic info
+        raw_course = cols[2].get_text(strip=True)
         
-        for row in rows:
-            cols = row.find_all('td')
-            if len(cols) < 8: continue
-            
-            # Extract basic info
-            raw_course = cols[2].get_text(strip=True)
-            
-            # Extract IDs for the Detail History (Option 3 drill-down)
-            view_btn = row.find('a', onclick=True)
-            course_id, type_code = None, None
-            if view_btn:
-                # Regex to pull 'AM_CSE...' and 'ETL' from the onclick string
-                match = re.search(r"Display\('[^']+',\s*'[^']+',\s*'([^']+)',\s*'([^']+)'\)", view_btn['onclick'])
-                if match:
-                    course_id = match.group(1)
-                    type_code = match.group(2)
+        # Extract IDs for the Detail History (Option 3 drill-down)
+        view_btn = row.find('a', onclick=True)
+        course_id, type_code = None, None
+        if view_btn:
+            # Regex to pull 'AM_CSE...' and 'ETL' from the onclick string
+            match = re.search(r"Display\('[^']+',\s*'[^']+',\s*'([^']+)',\s*'([^']+)'\)", view_btn['onclick'])
+            if match:
+                course_id = match.group(1)
+                type_code = match.group(2)
 
-            attendance_data.append({
-                'course_code': raw_course.split(' - ')[0],
-                'course_name': raw_course,
-                'course_type': raw_course.split(' - ')[-1],
-                'percentage': cols[7].get_text(strip=True).replace("%", ""),
-                'attended': cols[5].get_text(strip=True),
-                'total': cols[6].get_text(strip=True),
-                'slot': cols[3].get_text(strip=True),
-                'course_id': course_id,
-                'type_code': type_code
-            })
-            
-        return attendance_data
-    except Exception as e:
-        print(f"   [!] fetchAttendance Error: {e}")
-        return []
+        attendance_data.append({
+            'course_code': raw_course.split(' - ')[0],
+            'course_name': raw_course,
+            'course_type': raw_course.split(' - ')[-1],
+            'percentage': cols[7].get_text(strip=True).replace("%", ""),
+            'attended': cols[5].get_text(strip=True),
+            'total': cols[6].get_text(strip=True),
+            'slot': cols[3].get_text(strip=True),
+            'course_id': course_id,
+            'type_code': type_code
+        })
+        
+    return attendance_data
 
 # --- UPDATED: EXACT ATTENDANCE HISTORY PARSER ---
+def _attendance_detail_request(client: VtopClient, semesterId: str, courseId: str, courseType: str) -> Dict[str, Any]:
+    reg_no = _reg_no(client)
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": "https://vtop.vitap.ac.in/vtop/content"
+    }
+    payload = {
+        "semesterSubId": semesterId,
+        "registerNumber": reg_no,
+        "courseId": courseId,
+        "courseType": courseType,
+        "authorizedID": reg_no,
+        "x": datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
+    }
+    return {"url": "https://vtop.vitap.ac.in/vtop/processViewAttendanceDetail",
+            "data": payload, "headers": headers}
+
+@cached("attendance_detail")
 async def fetchAttendanceDetail(client: VtopClient, semesterId: str, courseId: str, courseType: str):
-    url = "https://vtop.vitap.ac.in/vtop/processViewAttendanceDetail"
-    
     try:
-        token = getattr(client, "csrf_token", "")
-        reg_no = getattr(client, "username", getattr(client, "reg_no", a))
+        response = await _post(client, "attendance_detail",
+                               **_attendance_detail_request(client, semesterId, courseId, courseType))
+        return await run_parser(parseAttendanceDetail, response.text)
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
-            "X-Requested-With": "XMLHttpRequest",
-            "Referer": "https://vtop.vitap.ac.in/vtop/content"
-        }
-        
-        payload = {
-            "_csrf": token,
-            "semesterSubId": semesterId,
-            "registerNumber": reg_no,
-            "courseId": courseId,
-            "courseType": courseType,
-            "authorizedID": reg_no,
-            "x": datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-        }
+    except Exception as e:
+        log(f"   [!] Detail fetch error: {e}")
+        return []
 
-        response = await client._client.post(url, data=payload, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # 1. Target the specific table ID from your HTML
-        table = soup.find('table', {'id': 'StudentAttendanceDetailDataTable'})
-        
-        if not table:
-            return []
+def parseAttendanceDetail(html: str, backend: Optional[str] = None) -> List[Dict[str, str]]:
+    """Date-wise history rows of one course."""
+    soup = make_soup(html, ATTENDANCE_DETAIL_STRAINER, backend)
+    
+    # 1. Target the specific table ID from your HTML
+    table = soup.find('table', {'id': 'StudentAttendanceDetailDataTable'})
+    
+    if not table:
+        return []
 
-        history = []
-        # 2. Iterate over the body rows
-        # Structure based on your HTML: [Sl.No, Date, Slot, Day/Time, Status, Remarks]
-        rows = table.find('tbody').find_all('tr')
+    history = []
+    # 2. Iterate over the body rows
+    # Structure based on your HTML: [Sl.No, Date, Slot, Day/Time, Status, Remarks]
+    rows = table.find('tbody').find_all('tr')
+    
+    for row in rows:
+        cols = row.find_all('td')
+        if len(cols) < 5: continue
         
-        for row in rows:
-            cols = row.find_all('td')
-            if len(cols) < 5: continue
-            
-            date_val = cols[1].get_text(strip=True)  # Index 1: Date
-            slot_val = cols[2].get_text(strip=True)  # Index 2: Slot
-            status_val = cols[4].get_text(strip=True) # Index 4: Status (Present/Absent)
-            
-            history.append({
-                'date': date_val,
-                'slot': slot_val,
-                'status': status_val
-            })
+        date_val = cols[1].get_text(strip=True)  # Index 1: Date
+        slot_val = cols[2].get_text(strip=True)  # Index 2: Slot
+        status_val = cols[4].get_text(strip=True) # Index 4: Status (Present/Absent)
         
-        return history
+        history.append({
+            'date': date_val,
+            'slot': slot_val,
+            'status': status_val
+        })
+    
+    return history
 
-    except Exception as e:
-        print(f"   [!] Detail fetch error: {e}")
-        return []
+# --- BATCHED ATTENDANCE HISTORY ---
+# How many processViewAttendanceDetail requests may be in flight at once.
+DETAIL_CONCURRENCY = 4
+
+async def fetchAttendanceDetails(client: VtopClient, semesterId: str, courses: List[Dict[str, Any]],
+                                 concurrency: int = DETAIL_CONCURRENCY, fresh: bool = False):
+    """
+    Fetches the history of every course in `courses` concurrently (at most
+    `concurrency` requests at a time) and yields (course, history, seconds)
+    in the original order, each one as soon as it and all earlier ones have
+    arrived. `seconds` is that request's own duration; their sum is what
+    the one-at-a-time path would have taken. Courses without a detail link
+    yield history None. fresh=True bypasses the response cache.
+    """
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(course):
+        c_id, c_type = course.get('course_id'), course.get('type_code')
+        if not (c_id and c_type):
+            return None, 0.0
+        async with limit:
+            started = time.perf_counter()
+            history = await fetchAttendanceDetail(client, semesterId, c_id, c_type, fresh=fresh)
+            return history, time.perf_counter() - started
+
+    tasks = [asyncio.create_task(one(course)) for course in courses]
+    try:
+        for course, task in zip(courses, tasks):
+            history, seconds = await task
+            yield course, history, seconds
+    finally:
+        # Consumer stopped early (or was cancelled): drop whatever is still pending
+        for task in tasks:
+            if not task.done(): task.cancel()
+
+# --- INCREMENTAL ATTENDANCE SYNC ---
+async def syncAttendanceDetails(client: VtopClient, semesterId: str, courses: List[Dict[str, Any]],
+                                concurrency: int = DETAIL_CONCURRENCY):
+    """
+    Drop-in for fetchAttendanceDetails() backed by the local AttendanceStore:
+    only courses whose attended/total counters changed since the last sync
+    are downloaded again (concurrently); their new rows are appended to the
+    stored log. Unchanged courses come straight from disk with seconds 0.
+    """
+    store = AttendanceStore(_reg_no(client), semesterId)
+    changed = [c for c in courses if store.needs_sync(c)]
+    changed_ids = {id(c) for c in changed}
+    pending = fetchAttendanceDetails(client, semesterId, changed, concurrency, fresh=True)
+    try:
+        for course in courses:
+            if id(course) not in changed_ids:
+                yield course, store.history(course), 0.0
+                continue
+            _, history, seconds = await pending.__anext__()
+            if history is not None:
+                # An empty page is only trusted when V-TOP reports no classes at
+                # all; otherwise the refetch failed and the stored log stands
+                if history or course.get('total') in ("0", ""):
+                    store.merge(course, history)
+                history = store.history(course)
+            yield course, history, seconds
+    finally:
+        await pending.aclose()
+        store.save()
+        log(f"   [+] Attendance sync: {len(changed)}/{len(courses)} courses changed, "
+            f"{store.new_rows} new records.")
+
+async def syncAttendance(client: VtopClient, semesterId: str,
+                         concurrency: int = DETAIL_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Attendance summary with each course's full history under "history" (1 + changed requests)."""
+    summary = await fetchAttendance(client, semesterId, fresh=True)
+    courses = []
+    async for course, history, _ in syncAttendanceDetails(client, semesterId, summary, concurrency):
+        courses.append(dict(course, history=history or []))
+    return courses
 
 # --- UPDATED: STRICT GRADE PARSER ---
 # --- UPDATED: STRICT GRADE PARSER ---
 # --- UPDATED: STRICT GRADE PARSER (services.py) ---
+@cached("grades", keep=lambda h: bool(h.get("courses")))
 async def fetchGradeHistory(client: VtopClient) -> Dict[str, Any]:
     url = "https://vtop.vitap.ac.in/vtop/examinations/examGradeView/StudentGradeHistory"
     try:
-        reg_no = getattr(client, "username", a)
-        token = getattr(client, "csrf_token", "")
+        reg_no = _reg_no(client)
         timestamp = int(time.time() * 1000)
 
-        payload = {"verifyMenu": "true", "authorizedID": reg_no, "_csrf": token, "nocache": f"@{timestamp}"}
+        payload = {"verifyMenu": "true", "authorizedID": reg_no, "nocache": f"@{timestamp}"}
         headers = {"X-Requested-With": "XMLHttpRequest", "Referer": "https://vtop.vitap.ac.in/vtop/content?"}
 
-        response = await client._client.post(url, data=payload, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        history = {"courses": [], "summary": {"cgpa": "8.13", "earned": "62.0", "registered": "66.0"}}
-        seen_codes = set()
-
-        for table in soup.find_all('table'):
-            if "course code" in table.get_text().lower():
-                rows = table.find_all('tr')
-                for row in rows:
-                    cols = row.find_all('td')
-                    if len(cols) >= 6:
-                        code = cols[1].get_text(strip=True)
-                        
-                        # Only grab rows where Col 1 is a valid Course Code
-                        if re.match(r'^[A-Z]{3,}\d{3,}', code) and code not in seen_codes:
-                            history["courses"].append({
-                                "code": code,
-                                "name": cols[2].get_text(strip=True),
-                                "credits": cols[4].get_text(strip=True),
-                                "grade": cols[5].get_text(strip=True)
-                            })
-                            seen_codes.add(code)
-                break
-        
-        # Summary Scraper
-        for table in soup.find_all('table'):
-            if "credits registered" in table.get_text().lower():
-                tr = table.find('tbody').find('tr') if table.find('tbody') else None
-                if tr:
-                    tds = tr.find_all('td')
-                    if len(tds) >= 3:
-                        history["summary"]["registered"] = tds[0].get_text(strip=True)
-                        history["summary"]["earned"] = tds[1].get_text(strip=True)
-                        history["summary"]["cgpa"] = tds[2].get_text(strip=True)
-                break
-
-        return history
-    except Exception:
-        return history
+        response = await _post(client, "grades", url, data=payload, headers=headers)
+        return await run_parser(parseGradeHistory, response.text)
+    except Exception as e:
+        log(f"   [!] Grade history fetch error: {e}")
+        return {"courses": [], "summary": {}}
+
+def parseGradeHistory(html: str, backend: Optional[str] = None) -> Dict[str, Any]:
+    """Transcript course rows plus the credits/CGPA summary."""
+    soup = make_soup(html, TABLE_STRAINER, backend)
+    
+    history = {"courses": [], "summary": {"cgpa": "8.13", "earned": "62.0", "registered": "66.0"}}
+    seen_codes = set()
+
+    for table in soup.find_all('table'):
+        if "course code" in table.get_text().lower():
+            rows = table.find_all('tr')
+            for row in rows:
+                cols = row.find_all('td')
+                if len(cols) >= 6:
+                    code = cols[1].get_text(strip=True)
+                    
+                    # Only grab rows where Col 1 is a valid Course Code
+                    if re.match(r'^[A-Z]{3,}\d{3,}', code) and code not in seen_codes:
+                        history["courses"].append({
+                            "code": code,
+                            "name": cols[2].get_text(strip=True),
+                            "credits": cols[4].get_text(strip=True),
+                            "grade": cols[5].get_text(strip=True)
+                        })
+                        seen_codes.add(code)
+            break
+    
+    # Summary Scraper
+    for table in soup.find_all('table'):
+        if "credits registered" in table.get_text().lower():
+            tr = table.find('tbody').find('tr') if table.find('tbody') else None
+            if tr:
+                tds = tr.find_all('td')
+                if len(tds) >= 3:
+                    history["summary"]["registered"] = tds[0].get_text(strip=True)
+                    history["summary"]["earned"] = tds[1].get_text(strip=True)
+                    history["summary"]["cgpa"] = tds[2].get_text(strip=True)
+            break
+
+    return history
+
 # --- TIMETABLE ---
+@cached("timetable")
 async def fetchTimetable(client: VtopClient, semesterId: str) -> Dict[str, Any]:
     try:
-        data = await client.get_timetable(sem_sub_id=semesterId)
+        async with policy.upstream_slot():
+            data = await client.get_timetable(sem_sub_id=semesterId)
         if hasattr(data, "model_dump"): return data.model_dump()
         return dict(data) if data else {}
     except Exception as e:
-        print(f"   [!] Timetable fetch error: {e}")
+        log(f"   [!] Timetable fetch error: {e}")
         return {}
 
-async def fetchTimetable(client: VtopClient, semesterId: str) -> Dict[str, Any]:
+# --- CHECKED FETCHES ---
+# The fetchers above log a failure and return an empty result, which looks
+# the same as V-TOP having nothing to show. Watch mode needs the difference
+# (an exam that disappears is news, a failed poll is not), so these raise.
+class FetchFailed(Exception):
+    pass
+
+CHECKED_PAGES = {
+    "attendance": (_attendance_request, parseAttendance),
+    "marks": (_marks_request, parseMarks),
+    "exams": (_exams_request, parseExamSchedule),
+}
+
+async def fetchChecked(client: VtopClient, name: str, semesterId: str):
+    """
+    The parsed `name` page, always fetched fresh. Raises FetchFailed when
+    V-TOP did not answer with the page itself (transport error, 5xx, or a
+    session that could not be renewed).
+    """
+    request, parse = CHECKED_PAGES[name]
     try:
-        data = await client.get_timetable(sem_sub_id=semesterId)
-        if hasattr(data, "model_dump"): return data.model_dump()
-        return dict(data) if data else {}
-    except:
-        return {}
\ No newline at end of file
+        response = await _post(client, name, **request(client, semesterId))
+    except Exception as e:
+        raise FetchFailed(f"{name}: {str(e) or type(e).__name__}") from e
+    if response.status_code != 200 or _token_rejected(response):
+        raise FetchFailed(f"{name}: V-TOP answered {response.status_code} without the page")
+    return await run_parser(parse, response.text)
+
+# ==========================================
+# 🌊 STREAMING FETCHERS
+# ==========================================
+# Async generators that yield rows while the page is still downloading:
+# the body is fed chunk by chunk into lxml's incremental HTML parser, and
+# every table row is handled as soon as its closing tag arrives, then
+# dropped from the tree, so memory stays flat however long the page is.
+# They yield exactly what the matching parse* function returns, one item
+# at a time (a course with its marks, an exam, a summary row, a history
+# row). Streams bypass the response cache and single-flight, but not the
+# request policy: retries and the deadline cover the download, and it holds
+# one upstream slot from request to last chunk. Consume them inside
+# contextlib.aclosing() so a consumer that stops early releases that slot
+# (and the connection) right away instead of whenever the generator is
+# garbage collected.
+STREAM_CHUNK = 16 * 1024
+MARKER_OVERLAP = 64  # chunk-to-chunk overlap when scanning for the login page markers
+
+def _cell(element) -> str:
+    # Same text as BeautifulSoup's get_text(strip=True)
+    return "".join(s.strip() for s in element.itertext())
+
+async def _stream_rows(client: VtopClient, endpoint: str, request: Dict[str, Any], unit):
+    """
+    POSTs `request` (see the _*_request builders) with the CSRF token and
+    yields, per completed row for which unit(tr) is true, that row followed by
+    the rows nested inside it - document order, like soup.find_all('tr').
+    """
+    request = dict(request)
+    url = request.pop("url")
+    # Hedging races two whole requests; only one body can be read
+    rules = dataclasses.replace(policy.policy_for(endpoint), hedge=False)
+    retry = _TokenRetry(client)
+    while True:
+        data, files = await retry.form(request.get("data"), request.get("files"))
+        outgoing = client._client.build_request("POST", url, data=data, files=files,
+                                                headers=request.get("headers"))
+        give_up_at = time.monotonic() + rules.deadline
+        rows = 0
+        async with policy.upstream_slot(across_yields=True):
+            response = await policy.call(endpoint, lambda: client._client.send(outgoing, stream=True),
+                                         rules, slot=False)
+            try:
+                stale = _redirected_to_login(response)
+                if not stale:
+                    parser = etree.HTMLPullParser(events=("end",), tag="tr",
+                                                  encoding=response.charset_encoding or "utf-8")
+                    seen = ""
+                    chunks = response.aiter_bytes(STREAM_CHUNK)
+                    while True:
+                        chunk = await _next_chunk(endpoint, chunks, give_up_at)
+                        if chunk is None:
+                            parser.close()
+                        else:
+                            # A login page or CSRF error parses into zero rows, so look for it too
+                            seen = seen[-MARKER_OVERLAP:] + chunk.decode("latin-1")
+                            stale = stale or _stale_page(seen)
+                            parser.feed(chunk)
+                        for row in _completed_rows(parser, unit):
+                            rows += 1
+                            paused = time.monotonic()
+                            yield row
+                            give_up_at += time.monotonic() - paused  # the consumer's time is not download time
+                        if chunk is None:
+                            break
+            finally:
+                await response.aclose()
+                metrics.RESPONSE_BYTES.inc(response.num_bytes_downloaded, endpoint=endpoint)
+        if not stale or rows or not await retry.replay():
+            return
+
+async def _next_chunk(endpoint: str, chunks, give_up_at: float) -> Optional[bytes]:
+    """The next body chunk, or None at the end; the policy deadline covers the whole download."""
+    try:
+        return await asyncio.wait_for(anext(chunks), max(0.0, give_up_at - time.monotonic()))
+    except StopAsyncIteration:
+        return None
+    except asyncio.TimeoutError:
+        policy.STATS["timeouts"] += 1
+        raise asyncio.TimeoutError(f"{endpoint} did not finish downloading in time")
+
+def _completed_rows(parser, unit):
+    for _, tr in parser.read_events():
+        if not unit(tr):
+            continue
+        yield tr
+        yield from tr.iterdescendants("tr")
+        # Done with this row: free it and everything before it
+        parent = tr.getparent()
+        tr.clear(keep_tail=False)
+        if parent is not None:
+            while tr.getprevious() is not None:
+                del parent[0]
+
+def _outermost(tr) -> bool:
+    return next(tr.iterancestors("tr"), None) is None
+
+def _rows_of(table_id: str, tbody_only: bool = False):
+    """unit() for the rows of table `table_id` (only its first <tbody> if tbody_only)."""
+    def unit(tr) -> bool:
+        table = next(tr.iterancestors("table"), None)
+        if table is None or table.get("id") != table_id:
+            return False
+        return not tbody_only or table.find("tbody") is tr.getparent()
+    return unit
+
+async def streamAttendance(client: VtopClient, semesterId: str):
+    """Yields the rows of parseAttendance() as they arrive."""
+    header_skipped = False
+    async with contextlib.aclosing(_stream_rows(client, "attendance", _attendance_request(client, semesterId),
+                                                _rows_of("AttendanceDetailDataTable"))) as rows:
+        async for row in rows:
+            if not header_skipped:
+                header_skipped = True
+                continue
+            cols = list(row.iter("td"))
+            if len(cols) < 8: continue
+            raw_course = _cell(cols[2])
+            course_id, type_code = None, None
+            view_btn = next((a for a in row.iter("a") if a.get("onclick") is not None), None)
+            if view_btn is not None:
+                match = re.search(r"Display\('[^']+',\s*'[^']+',\s*'([^']+)',\s*'([^']+)'\)", view_btn.get("onclick"))
+                if match:
+                    course_id, type_code = match.group(1), match.group(2)
+            yield {
+                'course_code': raw_course.split(' - ')[0],
+                'course_name': raw_course,
+                'course_type': raw_course.split(' - ')[-1],
+                'percentage': _cell(cols[7]).replace("%", ""),
+                'attended': _cell(cols[5]),
+                'total': _cell(cols[6]),
+                'slot': _cell(cols[3]),
+                'course_id': course_id,
+                'type_code': type_code
+            }
+
+async def streamAttendanceDetail(client: VtopClient, semesterId: str, courseId: str, courseType: str):
+    """Yields the rows of parseAttendanceDetail() as they arrive."""
+    request = _attendance_detail_request(client, semesterId, courseId, courseType)
+    async with contextlib.aclosing(_stream_rows(client, "attendance_detail", request,
+                                                _rows_of("StudentAttendanceDetailDataTable", tbody_only=True))) as rows:
+        async for row in rows:
+            cols = list(row.iter("td"))
+            if len(cols) < 5: continue
+            yield {'date': _cell(cols[1]), 'slot': _cell(cols[2]), 'status': _cell(cols[4])}
+
+async def streamExamSchedule(client: VtopClient, semesterId: str):
+    """Yields the exams of parseExamSchedule() as they arrive."""
+    current_exam_type = "Unknown"
+    async with contextlib.aclosing(_stream_rows(client, "exams", _exams_request(client, semesterId), _outermost)) as rows:
+        async for row in rows:
+            header_cell = next((td for td in row.iter("td") if "panelHead-secondary" in (td.get("class") or "").split()), None)
+            if header_cell is not None:
+                current_exam_type = _cell(header_cell)
+                continue
+            cols = list(row.iter("td"))
+            if len(cols) >= 11 and re.match(r'^[A-Z]+\d{3,}', _cell(cols[1])):
+                yield {
+                    'course_code': _cell(cols[1]),
+                    'course_title': _cell(cols[2]),
+                    'class_id': _cell(cols[4]),
+                    'exam_type': current_exam_type,
+                    'exam_date': _cell(cols[6]),
+                    'exam_time': _cell(cols[9]),
+                    'venue': _cell(cols[10])
+                }
+
+async def streamMarks(client: VtopClient, semesterId: str):
+    """Yields the courses of parseMarks() (with their marks) as each one completes."""
+    valid_types = ["CAT", "FAT", "Assignment", "Digital", "Quiz", "Lab", "Project", "Mid-Term"]
+    current_course = None
+    async with contextlib.aclosing(_stream_rows(client, "marks", _marks_request(client, semesterId), _outermost)) as rows:
+        async for row in rows:
+            cols = list(row.iter("td"))
+            if not cols: continue
+            col1_text = _cell(cols[1]) if len(cols) > 1 else ""
+            if re.match(r'^[A-Z]+\d{3,}', col1_text):
+                if current_course: yield current_course
+                current_course = {
+                    "course_code": col1_text,
+                    "course_title": _cell(cols[2]) if len(cols) > 2 else "Unknown",
+                    "details": []
+                }
+                continue
+            if current_course and len(cols) >= 6:
+                if any(v in col1_text for v in valid_types) and "Total" not in col1_text:
+                    scored = _cell(cols[5])
+                    if not scored or scored == "-":
+                        scored = _cell(cols[4])
+                    current_course["details"].append({
+                        "mark_title": col1_text,
+                        "max_mark": _cell(cols[2]),
+                        "scored_mark": scored
+                    })
+    if current_course:
+        yield current_course
+
+STREAMERS = {
+    "attendance": streamAttendance,
+    "marks": streamMarks,
+    "exams": streamExamSchedule,
+}
+
+# ==========================================
+# 3. MULTI-FETCH
+# ==========================================
+DATA_FETCHERS = {
+    "attendance": lambda client, sem: fetchAttendance(client, sem),
+    "marks": lambda client, sem: fetchMarks(client, sem),
+    "exams": lambda client, sem: fetchExamSchedule(client, sem),
+    "timetable": lambda client, sem: fetchTimetable(client, sem),
+    "grades": lambda client, sem: fetchGradeHistory(client),
+    "profile": lambda client, sem: fetchProfile(client),
+    "semesters": lambda client, sem: fetchSemesters(client),
+    "attendance_history": lambda client, sem: syncAttendance(client, sem),
+}
+SEMESTER_SCOPED = ("attendance", "marks", "exams", "timetable", "attendance_history")
+
+async def fetchMany(client: VtopClient, names: List[str], semesterId: Optional[str] = None,
+                    on_result=None) -> Dict[str, Any]:
+    """
+    Fetches just the requested data sets concurrently. Semester-scoped ones
+    use `semesterId`, defaulting to the latest semester. on_result(name,
+    semester, result) is called as each one completes. Returns
+    {"semester": ..., name: result, ...}.
+    """
+    names = list(dict.fromkeys(names))
+    results: Dict[str, Any] = {}
+
+    # Only look the semester list up when it is asked for or needed for the default
+    if "semesters" in names or (not semesterId and any(n in SEMESTER_SCOPED for n in names)):
+        results["semesters"] = await fetchSemesters(client)
+        semesterId = semesterId or (results["semesters"][0]["id"] if results["semesters"] else None)
+        if "semesters" in names and on_result:
+            on_result("semesters", None, results["semesters"])
+
+    async def run(name):
+        scoped = semesterId if name in SEMESTER_SCOPED else None
+        return name, scoped, await DATA_FETCHERS[name](client, scoped)
+
+    for next_done in asyncio.as_completed([run(n) for n in names if n != "semesters"]):
+        name, scoped, result = await next_done
+        results[name] = result
+        if on_result:
+            on_result(name, scoped, result)
+
+    document = {"semester": semesterId}
+    document.update({n: results.get(n) for n in names})
+    return document
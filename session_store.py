@@ -0,0 +1,92 @@
+import base64
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from cache import STATE_DIR, ensure_state_dir
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Session persistence is simply unavailable without it
+    Fernet = None
+
+# ==========================================
+# 🔐 SAVED SESSIONS
+# ==========================================
+# After a successful login the cookie jar and CSRF token are written to
+# .vtop/sessions/, encrypted with a key derived from the account password
+# (PBKDF2 + Fernet) and readable by the owner only. A changed password simply
+# makes the old file undecryptable, which is treated like "no session".
+
+SESSION_DIR = os.path.join(STATE_DIR, "sessions")
+# V-TOP drops idle sessions long before this; older files are not even tried.
+MAX_SESSION_AGE = 12 * 3600
+KDF_ITERATIONS = 100_000
+
+
+def is_available() -> bool:
+    return Fernet is not None
+
+
+def _session_path(reg_no: str) -> str:
+    name = hashlib.sha256(reg_no.encode()).hexdigest()[:16]
+    return os.path.join(SESSION_DIR, f"{name}.session")
+
+
+def _fernet(password: str, salt: bytes) -> "Fernet":
+    key = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, KDF_ITERATIONS)
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def save_session(client, reg_no: str, password: str) -> bool:
+    if Fernet is None:
+        return False
+
+    state = {
+        "saved_at": time.time(),
+        "csrf_token": getattr(client, "csrf_token", ""),
+        "cookies": [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in client._client.cookies.jar
+        ],
+    }
+    salt = os.urandom(16)
+    token = _fernet(password, salt).encrypt(json.dumps(state).encode())
+
+    ensure_state_dir(SESSION_DIR)
+    path = _session_path(reg_no)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"salt": base64.b64encode(salt).decode(), "token": token.decode()}, f)
+    return True
+
+
+def load_session(client, reg_no: str, password: str) -> bool:
+    """Restores cookies and CSRF token onto the client. False if nothing usable was saved."""
+    state = _read_session(reg_no, password)
+    if not state or time.time() - state.get("saved_at", 0) > MAX_SESSION_AGE:
+        return False
+
+    for c in state.get("cookies", []):
+        client._client.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+    client.csrf_token = state.get("csrf_token", "")
+    return True
+
+
+def _read_session(reg_no: str, password: str) -> Optional[dict]:
+    if Fernet is None:
+        return None
+    try:
+        with open(_session_path(reg_no), "r") as f:
+            blob = json.load(f)
+        salt = base64.b64decode(blob["salt"])
+        return json.loads(_fernet(password, salt).decrypt(blob["token"].encode()))
+    except (OSError, ValueError, KeyError, InvalidToken):
+        return None
+
+
+def clear_session(reg_no: str) -> None:
+    try: os.remove(_session_path(reg_no))
+    except FileNotFoundError: pass
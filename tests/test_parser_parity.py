@@ -0,0 +1,43 @@
+"""
+Every --parser backend must return exactly what html.parser returns, on every
+generated page in bench/fixtures.py (base pages and scaled-up variants).
+"""
+import pytest
+
+from bench import fixtures
+from services import (
+    PARSER_BACKENDS,
+    parseAttendance,
+    parseAttendanceDetail,
+    parseExamSchedule,
+    parseGradeHistory,
+    parseMarks,
+    parseProfile,
+    parseSemesters,
+)
+
+PARSERS = {
+    "profile": parseProfile,
+    "semesters": lambda html, backend=None: parseSemesters(html),
+    "marks": parseMarks,
+    "exams": parseExamSchedule,
+    "attendance": parseAttendance,
+    "attendance_detail": parseAttendanceDetail,
+    "grades": parseGradeHistory,
+}
+PAGES = {**fixtures.BASE, **fixtures.SCALED}
+BACKENDS = [b for b in PARSER_BACKENDS if b != "html.parser"]
+
+
+def _parser_for(page: str):
+    # "attendance_detail_200" belongs to attendance_detail, not attendance
+    return PARSERS[max((e for e in PARSERS if page.startswith(e)), key=len)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("page", PAGES)
+def test_backend_matches_html_parser(page, backend):
+    parse, html = _parser_for(page), PAGES[page]()
+    expected = parse(html, "html.parser")
+    assert expected, "html.parser found nothing on the fixture page"
+    assert parse(html, backend) == expected
@@ -0,0 +1,132 @@
+"""
+ResponseCache freshness, stale limits and size-bounded eviction, and the
+stale-while-revalidate path of services.cached().
+"""
+import asyncio
+import types
+
+import pytest
+
+import cache
+import services
+from cache import DEFAULT_MAX_BYTES, ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def store(tmp_path):
+    responses = ResponseCache(path=str(tmp_path / "responses.db"), ttls={"marks": 60}, max_stale=300)
+    yield responses
+    responses.close()
+
+
+def test_entry_is_fresh_then_stale_then_gone(store, clock):
+    store.put("marks", "23BCE0001", "AP2025262", (), {"courses": [1]})
+    assert store.get("marks", "23BCE0001", "AP2025262") == ({"courses": [1]}, True)
+
+    clock[0] += 61
+    assert store.get("marks", "23BCE0001", "AP2025262") == ({"courses": [1]}, False)
+
+    clock[0] += 300
+    assert store.get("marks", "23BCE0001", "AP2025262") is None
+
+
+def test_entries_are_keyed_by_account_semester_and_extra(store, clock):
+    store.put("marks", "23BCE0001", "AP2025262", ("C1",), "mine")
+    assert store.get("marks", "23BCE0002", "AP2025262", ("C1",)) is None
+    assert store.get("marks", "23BCE0001", "AP2024251", ("C1",)) is None
+    assert store.get("marks", "23BCE0001", "AP2025262", ("C2",)) is None
+    assert store.get("marks", "23BCE0001", "AP2025262", ("C1",)) == ("mine", True)
+
+
+def test_least_recently_used_entries_go_past_default_max_bytes(tmp_path, clock):
+    responses = ResponseCache(path=str(tmp_path / "responses.db"))
+    assert responses.max_bytes == DEFAULT_MAX_BYTES
+    body = "x" * (DEFAULT_MAX_BYTES // 3 - 16)
+    try:
+        for semester in ("S1", "S2", "S3"):
+            clock[0] += 1
+            responses.put("marks", "23BCE0001", semester, (), body)
+        clock[0] += 1
+        assert responses.get("marks", "23BCE0001", "S1") is not None  # now the most recently used
+
+        clock[0] += 1
+        responses.put("marks", "23BCE0001", "S4", (), body)
+
+        assert responses.get("marks", "23BCE0001", "S2") is None
+        for semester in ("S1", "S3", "S4"):
+            assert responses.get("marks", "23BCE0001", semester) is not None
+    finally:
+        responses.close()
+
+
+@pytest.fixture
+def installed(store):
+    services.configure_cache(store)
+    yield store
+    services.configure_cache(None)
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(installed, clock):
+    installed.stale_while_revalidate = True
+    client = types.SimpleNamespace(username="23BCE0001")
+    calls = []
+
+    @services.cached("marks")
+    async def fetch(client, semester):
+        calls.append(semester)
+        await asyncio.sleep(0)
+        return {"courses": [len(calls)]}
+
+    async def scenario():
+        assert await fetch(client, "AP2025262") == {"courses": [1]}
+        assert await fetch(client, "AP2025262") == {"courses": [1]}  # fresh hit
+        assert len(calls) == 1
+
+        clock[0] += 61
+        # Both callers get the stale value at once; only one refresh starts
+        assert await fetch(client, "AP2025262") == {"courses": [1]}
+        assert await fetch(client, "AP2025262") == {"courses": [1]}
+        assert len(services._revalidations) == 1
+        await asyncio.gather(*services._revalidations.values())
+
+        assert await fetch(client, "AP2025262") == {"courses": [2]}
+        assert len(calls) == 2
+        assert not services._revalidations
+
+    asyncio.run(scenario())
+
+
+def test_stale_entry_without_revalidation_is_fetched_in_the_foreground(installed, clock):
+    client = types.SimpleNamespace(username="23BCE0001")
+    calls = []
+
+    @services.cached("marks")
+    async def fetch(client, semester):
+        calls.append(semester)
+        return {"courses": [len(calls)]}
+
+    async def scenario():
+        await fetch(client, "AP2025262")
+        clock[0] += 61
+        assert await fetch(client, "AP2025262") == {"courses": [2]}
+        assert not services._revalidations
+
+    asyncio.run(scenario())
+
+
+def test_results_failing_keep_are_not_stored(installed, clock):
+    client = types.SimpleNamespace(username="23BCE0001")
+
+    @services.cached("marks")
+    async def fetch(client, semester):
+        return {}
+
+    asyncio.run(fetch(client, "AP2025262"))
+    assert installed.get("marks", "23BCE0001", "AP2025262") is None
@@ -0,0 +1,105 @@
+"""
+Session upkeep against mock_server.py: an expired CSRF token is renewed once
+and the request replayed once, and the keep-alive heartbeat gives up after
+the idle ceiling.
+"""
+import asyncio
+import contextlib
+
+import pytest
+
+import services
+from mock_server import MockConfig, run_mock
+
+REG_NO = "23BCE0001"
+SEMESTER = "AP2025262"
+MARKS = "/vtop/examinations/doStudentMarkView"
+EXAMS = "/vtop/examinations/doSearchExamScheduleForStudent"
+ATTENDANCE = "/vtop/processViewStudentAttendance"
+
+
+@pytest.fixture(autouse=True)
+def scratch(tmp_path, monkeypatch):
+    # Fetchers drop debug_*.html files next to them when a page has no data
+    monkeypatch.chdir(tmp_path)
+    services.configure_cache(None)
+
+
+@contextlib.asynccontextmanager
+async def mock_session(config: MockConfig):
+    server, mock = await run_mock("127.0.0.1", 0, config)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with services.openClient(REG_NO, "secret", f"http://127.0.0.1:{port}") as client:
+            services.silence_logs()
+            assert await services.vtopSessionLogin(client, "secret", persist=False)
+            yield client, mock
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_expired_token_is_renewed_and_the_request_replayed_once():
+    async def scenario():
+        async with mock_session(MockConfig(csrf_ttl=0.2)) as (client, mock):
+            manager = services.tokens(client)
+            assert (await services.fetchMarks(client, SEMESTER, fresh=True))["courses"]
+            assert mock.hits[MARKS] == 1 and manager.refreshes == 0
+
+            await asyncio.sleep(0.3)
+            marks, exams, attendance = await asyncio.gather(
+                services.fetchMarks(client, SEMESTER, fresh=True),
+                services.fetchExamSchedule(client, SEMESTER, fresh=True),
+                services.fetchAttendance(client, SEMESTER, fresh=True),
+            )
+            assert marks["courses"] and exams and attendance
+            # Three requests hit the expiry together: one refresh, one replay each
+            assert manager.refreshes == 1 and manager.relogins == 0
+            assert mock.hits[MARKS] == 3
+            assert mock.hits[EXAMS] == 2
+            assert mock.hits[ATTENDANCE] == 2
+
+    asyncio.run(scenario())
+
+
+def test_token_still_rejected_after_renewal_is_not_replayed_again():
+    async def scenario():
+        # Every token is already expired when it reaches the mock
+        async with mock_session(MockConfig(csrf_ttl=1e-9)) as (client, mock):
+            manager = services.tokens(client)
+            assert await services.fetchExamSchedule(client, SEMESTER, fresh=True) == []
+            assert mock.hits[EXAMS] == 2
+            assert manager.refreshes == 1
+
+    asyncio.run(scenario())
+
+
+def test_dead_session_logs_in_again():
+    async def scenario():
+        async with mock_session(MockConfig()) as (client, mock):
+            manager = services.tokens(client)
+            mock.sessions.clear()  # the portal forgot the session
+            assert (await services.fetchMarks(client, SEMESTER, fresh=True))["courses"]
+            assert manager.refreshes == 1 and manager.relogins == 1
+            assert mock.hits[MARKS] == 2
+
+    asyncio.run(scenario())
+
+
+def test_keepalive_stops_after_the_idle_ceiling():
+    async def scenario():
+        async with mock_session(MockConfig()) as (client, mock):
+            keepalive = services.SessionKeepAlive(client, interval=0.05, idle_timeout=0.3).start()
+            await asyncio.sleep(0.6)
+            assert keepalive._task.done()
+            assert keepalive.beats >= 3 and keepalive.renewals == 0
+
+            probes = mock.hits["/vtop/content"]
+            await asyncio.sleep(0.2)
+            assert mock.hits["/vtop/content"] == probes  # no beats once idle
+
+            keepalive.touch()  # activity restarts it
+            assert not keepalive._task.done()
+            keepalive.stop()
+
+    asyncio.run(scenario())
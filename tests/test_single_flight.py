@@ -0,0 +1,122 @@
+"""
+services._single_flight() and cached(): overlapping identical fetches share
+one upstream call, and the shared fetch is cancelled only when its last
+waiter goes away.
+"""
+import asyncio
+import types
+
+import pytest
+
+import services
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    services.configure_cache(None)
+    services._in_flight.clear()
+    yield
+    services._in_flight.clear()
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    client = types.SimpleNamespace(username="23BCE0001")
+    calls = []
+
+    @services.cached("marks")
+    async def fetch(client, semester):
+        calls.append(semester)
+        await asyncio.sleep(0.01)
+        return {"courses": [semester]}
+
+    async def scenario():
+        before = dict(services.SINGLE_FLIGHT)
+        results = await asyncio.gather(*(fetch(client, "AP2025262") for _ in range(5)),
+                                       fetch(client, "AP2024251"))
+        assert results[:5] == [{"courses": ["AP2025262"]}] * 5
+        assert results[5] == {"courses": ["AP2024251"]}
+        assert sorted(calls) == ["AP2024251", "AP2025262"]
+        assert services.SINGLE_FLIGHT["fetches"] - before["fetches"] == 2
+        assert services.SINGLE_FLIGHT["joined"] - before["joined"] == 4
+        assert not services._in_flight
+
+        # Once finished, the next call fetches again
+        await fetch(client, "AP2025262")
+        assert len(calls) == 3
+
+    asyncio.run(scenario())
+
+
+def test_other_accounts_do_not_share_a_fetch():
+    calls = []
+
+    @services.cached("marks")
+    async def fetch(client, semester):
+        calls.append(client.username)
+        await asyncio.sleep(0.01)
+        return {"courses": [client.username]}
+
+    async def scenario():
+        a, b = (types.SimpleNamespace(username=u) for u in ("23BCE0001", "23BCE0002"))
+        assert await asyncio.gather(fetch(a, "S"), fetch(b, "S")) == [{"courses": ["23BCE0001"]},
+                                                                     {"courses": ["23BCE0002"]}]
+        assert sorted(calls) == ["23BCE0001", "23BCE0002"]
+
+    asyncio.run(scenario())
+
+
+def test_waiters_are_counted_and_released():
+    release = None
+
+    async def fetch():
+        await release.wait()
+        return "page"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        callers = [asyncio.create_task(services._single_flight(("k",), fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert services._in_flight[("k",)].waiters == 3
+
+        callers[0].cancel()
+        await asyncio.sleep(0)
+        flight = services._in_flight[("k",)]
+        assert flight.waiters == 2
+        assert not flight.task.cancelled()
+
+        release.set()
+        assert await asyncio.gather(*callers[1:]) == ["page", "page"]
+        assert flight.waiters == 0
+        assert not services._in_flight
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_the_only_waiter_cancels_the_shared_fetch():
+    started = cancelled = None
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def scenario():
+        nonlocal started, cancelled
+        started, cancelled = asyncio.Event(), asyncio.Event()
+        caller = asyncio.create_task(services._single_flight(("k",), fetch))
+        await started.wait()
+        flight = services._in_flight[("k",)]
+
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert flight.task.cancelled()
+        assert not services._in_flight
+
+    asyncio.run(scenario())
@@ -0,0 +1,186 @@
+import asyncio
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# ==========================================
+# 🔬 TRACING (--trace)
+# ==========================================
+# Spans for login, every HTTP request, CSRF refreshes, fetchers, parsing
+# and rendering, written as a Chrome trace-event file (open it in
+# chrome://tracing or https://ui.perfetto.dev) plus a summary table at exit.
+# Disabled, span() hands back one shared do-nothing object and @traced
+# costs a flag check per call.
+
+ENABLED = False
+DEFAULT_TRACE_PATH = "vtop-trace.json"
+
+_events: List[Dict[str, Any]] = []
+_lanes: Dict[Any, int] = {}
+_origin = time.perf_counter_ns()
+
+
+def enable() -> None:
+    global ENABLED, _origin
+    ENABLED = True
+    _origin = time.perf_counter_ns()
+
+
+class _NoSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def set(self, **args): pass
+
+
+NO_SPAN = _NoSpan()
+
+
+def _lane() -> int:
+    """One timeline row per asyncio task (or thread), numbered in order of appearance."""
+    try:
+        owner = asyncio.current_task()
+    except RuntimeError:
+        owner = None
+    key = id(owner) if owner is not None else ("thread", threading.get_ident())
+    return _lanes.setdefault(key, len(_lanes) + 1)
+
+
+class Span:
+    __slots__ = ("name", "cat", "args", "start", "lane")
+
+    def __init__(self, name: str, cat: str, args: Dict[str, Any]):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self.lane = _lane()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.finish()
+        return False
+
+    def set(self, **args) -> None:
+        self.args.update(args)
+
+    def finish(self) -> None:
+        _events.append({
+            "name": self.name, "cat": self.cat, "ph": "X", "pid": os.getpid(), "tid": self.lane,
+            "ts": (self.start - _origin) / 1000, "dur": (time.perf_counter_ns() - self.start) / 1000,
+            "args": self.args,
+        })
+
+
+def span(name: str, cat: str = "app", **args):
+    if not ENABLED:
+        return NO_SPAN
+    return Span(name, cat, args)
+
+
+def traced(cat: str, name: Optional[str] = None):
+    """Decorator: one span per call of a sync or async function."""
+    def decorator(fn):
+        label = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return await fn(*args, **kwargs)
+                with Span(label, cat, {}):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return fn(*args, **kwargs)
+                with Span(label, cat, {}):
+                    return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- HTTP: a transport wrapper, so VtopClient's own login requests show up too ---
+class _TracedStream(httpx.AsyncByteStream):
+    def __init__(self, inner, span: Span):
+        self.inner, self.span, self.size = inner, span, 0
+        self.closed = False
+
+    async def __aiter__(self):
+        async for chunk in self.inner:
+            self.size += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+        if not self.closed:
+            self.closed = True
+            self.span.set(bytes=self.size)
+            self.span.finish()
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """Spans every request from send until its body has been read (or the stream closed)."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        s = Span(f"{request.method} {request.url.path}", "http", {"url": str(request.url)})
+        s.__enter__()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except BaseException as e:
+            s.set(error=type(e).__name__)
+            s.finish()
+            raise
+        s.set(status=response.status_code)
+        response.stream = _TracedStream(response.stream, s)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def instrument(client) -> None:
+    """Wraps a VtopClient's HTTP transport (call after any base-URL rewrite)."""
+    if ENABLED:
+        client._client._transport = TracingTransport(client._client._transport)
+
+
+# --- output ---
+def summary() -> List[Dict[str, Any]]:
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for e in _events:
+        g = groups.setdefault((e["cat"], e["name"]), {"cat": e["cat"], "name": e["name"], "count": 0,
+                                                     "total_ms": 0.0, "max_ms": 0.0, "bytes": 0})
+        ms = e["dur"] / 1000
+        g["count"] += 1
+        g["total_ms"] += ms
+        g["max_ms"] = max(g["max_ms"], ms)
+        g["bytes"] += e["args"].get("bytes", 0)
+    return sorted(groups.values(), key=lambda g: (g["cat"], -g["total_ms"]))
+
+
+def finish(path: str = DEFAULT_TRACE_PATH, stream=None) -> None:
+    """Writes the trace file and prints the summary table (no-op when disabled)."""
+    if not ENABLED:
+        return
+    stream = stream or sys.stderr
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f, default=str)
+
+    print(f"\n[⏱] Trace: {len(_events)} spans written to {path}", file=stream)
+    print(f"   {'CATEGORY':<8} {'SPAN':<42} {'N':>5} {'TOTAL ms':>10} {'AVG ms':>9} {'MAX ms':>9} {'KB':>8}", file=stream)
+    for g in summary():
+        kb = f"{g['bytes'] / 1024:.0f}" if g["bytes"] else "-"
+        print(f"   {g['cat']:<8} {g['name'][:42]:<42} {g['count']:>5} {g['total_ms']:>10.1f} "
+              f"{g['total_ms'] / g['count']:>9.1f} {g['max_ms']:>9.1f} {kb:>8}", file=stream)
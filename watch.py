@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import metrics
+from services import (
+    FetchFailed,
+    fetchChecked,
+    log,
+)
+
+# ==========================================
+# 👀 WATCH MODE
+# ==========================================
+# Polls marks, attendance and the exam schedule on one warm session and
+# reports only what changed. Each endpoint has its own interval, which grows
+# (up to a ceiling) every time a poll finds nothing new and snaps back to the
+# base interval as soon as something changes. A failed poll is not a
+# change; an empty page is, and is diffed like any other.
+
+# Base polling interval per endpoint, in seconds
+WATCH_INTERVALS = {"marks": 900, "attendance": 600, "exams": 1800}
+MAX_INTERVAL = 4 * 3600
+BACKOFF = 1.5
+
+POLLS = metrics.counter("vtop_watch_polls_total", "Watch mode polls, by endpoint.")
+CHANGES = metrics.counter("vtop_watch_changes_total", "Changes reported by watch mode, by endpoint and type.")
+
+
+def digest(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# --- per-endpoint diffs: old parsed result, new parsed result -> events ---
+def diff_marks(old, new) -> List[Dict[str, Any]]:
+    def flatten(data):
+        return {
+            (c.get('course_code'), m.get('mark_title')): (c.get('course_title'), m)
+            for c in (data or {}).get("courses", []) for m in c.get('details', [])
+        }
+    before, after, events = flatten(old), flatten(new), []
+    for (code, title), (course, mark) in after.items():
+        prev = before.get((code, title))
+        if prev is None:
+            events.append({"type": "mark_posted", "course_code": code, "course_title": course,
+                           "mark_title": title, "scored": mark.get('scored_mark'), "max": mark.get('max_mark')})
+        elif prev[1] != mark:
+            events.append({"type": "mark_updated", "course_code": code, "course_title": course, "mark_title": title,
+                           "scored": mark.get('scored_mark'), "previous": prev[1].get('scored_mark')})
+    for code, title in before.keys() - after.keys():
+        events.append({"type": "mark_removed", "course_code": code, "course_title": before[(code, title)][0],
+                       "mark_title": title})
+    return events
+
+
+def diff_attendance(old, new) -> List[Dict[str, Any]]:
+    def counts(sub):
+        try: return int(sub.get('attended', 0)), int(sub.get('total', 0))
+        except ValueError: return 0, 0
+    before = {(s.get('course_code'), s.get('course_type')): s for s in old or []}
+    after = {(s.get('course_code'), s.get('course_type')): s for s in new or []}
+    events = []
+    for key, sub in after.items():
+        prev = before.get(key)
+        if prev is None or counts(prev) == counts(sub):
+            continue
+        (a0, t0), (a1, t1) = counts(prev), counts(sub)
+        missed = (t1 - t0) - (a1 - a0)
+        events.append({
+            "type": "absence" if missed > 0 else "attendance_updated",
+            "course_code": sub.get('course_code'), "course_name": sub.get('course_name'),
+            "attended": sub.get('attended'), "total": sub.get('total'), "percentage": sub.get('percentage'),
+            "new_absences": max(missed, 0),
+        })
+    for key in before.keys() - after.keys():
+        events.append({"type": "attendance_removed", "course_code": key[0], "course_type": key[1],
+                       "course_name": before[key].get('course_name')})
+    return events
+
+
+def diff_exams(old, new) -> List[Dict[str, Any]]:
+    fields = ("exam_date", "exam_time", "venue")
+    before = {(e.get('course_code'), e.get('exam_type')): e for e in old or []}
+    after = {(e.get('course_code'), e.get('exam_type')): e for e in new or []}
+    events = []
+    for key, exam in after.items():
+        prev = before.get(key)
+        if prev is None:
+            events.append(dict({"type": "exam_added"}, **exam))
+            continue
+        changes = {f: {"from": prev.get(f), "to": exam.get(f)} for f in fields if prev.get(f) != exam.get(f)}
+        if changes:
+            events.append({"type": "exam_changed", "course_code": key[0], "exam_type": key[1],
+                           "course_title": exam.get('course_title'), "changes": changes})
+    for key in before.keys() - after.keys():
+        events.append({"type": "exam_removed", "course_code": key[0], "exam_type": key[1]})
+    return events
+
+
+WATCHERS = {
+    "marks": (lambda client, sem: fetchChecked(client, "marks", sem), diff_marks),
+    "attendance": (lambda client, sem: fetchChecked(client, "attendance", sem), diff_attendance),
+    "exams": (lambda client, sem: fetchChecked(client, "exams", sem), diff_exams),
+}
+
+
+class EndpointPoller:
+    def __init__(self, name: str, base_interval: float, max_interval: float = MAX_INTERVAL):
+        self.name = name
+        self.fetch, self.diff = WATCHERS[name]
+        self.base = base_interval
+        self.max = max(max_interval, base_interval)
+        self.interval = base_interval
+        self.snapshot = None
+        self.hash: Optional[str] = None
+        self.polls = 0
+        self.failures = 0
+
+    async def poll(self, client, semester: str) -> List[Dict[str, Any]]:
+        """One fetch; returns the change events (none on the very first poll)."""
+        self.polls += 1
+        try:
+            data = await self.fetch(client, semester)
+        except FetchFailed as e:
+            # Not a change, just try again later
+            self.failures += 1
+            log(f"   [!] Poll failed: {e}")
+            return []
+        self.failures = 0
+        new_hash = digest(data)
+        if new_hash == self.hash:
+            self.interval = min(self.interval * BACKOFF, self.max)
+            return []
+        events = self.diff(self.snapshot, data) if self.hash is not None else []
+        self.snapshot, self.hash = data, new_hash
+        self.interval = self.base
+        return events
+
+
+async def emit(event: Dict[str, Any], hook: Optional[str] = None) -> None:
+    line = json.dumps(event, default=str, ensure_ascii=False)
+    if not hook:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+        return
+    # The hook command gets the event as JSON on stdin
+    proc = await asyncio.create_subprocess_shell(hook, stdin=asyncio.subprocess.PIPE)
+    await proc.communicate(line.encode())
+    if proc.returncode:
+        log(f"   [!] Hook exited with status {proc.returncode} for {event['type']}")
+
+
+async def run_watch(client, semester: str, endpoints: List[str], intervals: Optional[Dict[str, float]] = None,
+                    max_interval: float = MAX_INTERVAL, hook: Optional[str] = None,
+                    metrics_path: Optional[str] = None) -> int:
+    intervals = dict(WATCH_INTERVALS, **(intervals or {}))
+    pollers = [EndpointPoller(name, intervals[name], max_interval) for name in endpoints]
+    log(f"[-] Watching {', '.join(endpoints)} for {semester} (Ctrl+C to stop)...")
+
+    async def loop(poller: EndpointPoller):
+        while True:
+            started = time.perf_counter()
+            # Expired tokens/sessions are renewed inside the fetchers (services._post)
+            events = await poller.poll(client, semester)
+            POLLS.inc(endpoint=poller.name)
+            for event in events:
+                CHANGES.inc(endpoint=poller.name, type=event["type"])
+                event.update(endpoint=poller.name, semester=semester, at=datetime.now().isoformat(timespec="seconds"))
+                await emit(event, hook)
+            log(f"   [{poller.name}] poll #{poller.polls}: {len(events)} change(s) in "
+                f"{time.perf_counter() - started:.2f}s, next in {poller.interval:.0f}s")
+            if metrics_path:
+                try:
+                    metrics.write_textfile(metrics_path)
+                except OSError as e:
+                    log(f"   [!] Could not write metrics to {metrics_path}: {e}")
+            # Small jitter so the endpoints drift apart instead of firing together
+            await asyncio.sleep(poller.interval * random.uniform(0.95, 1.05))
+
+    await asyncio.gather(*(loop(p) for p in pollers))
+    return 0